@@ -29,12 +29,10 @@ pub async fn run(
         .await
         .context("IMAP connection failed")?;
 
-    // SELECT INBOX and find the highest UID currently present
-    client
-        .session_mut()
-        .select("INBOX")
-        .await
-        .map_err(|e| anyhow::anyhow!("SELECT INBOX: {e}"))?;
+    // SELECT INBOX and find the highest UID currently present. Selecting and
+    // searching through the client keeps its selected-folder cache, so the
+    // per-poll fetch below doesn't re-SELECT.
+    client.select("INBOX").await?;
 
     let initial_max_uid = get_max_uid(&mut client).await?;
 
@@ -48,6 +46,9 @@ pub async fn run(
     let timeout = std::time::Duration::from_secs(wait_secs);
     let poll_interval = std::time::Duration::from_secs(5);
     let mut last_seen_uid = initial_max_uid;
+    // Filters are fixed for the whole run; lowercase them once, not per message.
+    let from_filter_lower = from_filter.map(str::to_lowercase);
+    let subject_filter_lower = subject_filter.map(str::to_lowercase);
 
     loop {
         if start.elapsed() >= timeout {
@@ -63,34 +64,30 @@ pub async fn run(
         }
 
         // Search for UIDs greater than last_seen
-        let new_uids = search_new_uids(&mut client, last_seen_uid).await?;
-
-        for uid in new_uids {
-            if uid <= last_seen_uid {
-                continue;
-            }
-            last_seen_uid = uid;
-
-            // Fetch the full message
-            let msg = match imap::fetch_message(&mut client, "INBOX", uid).await? {
-                Some(m) => m,
-                None => continue,
-            };
-
+        let mut new_uids = search_new_uids(&mut client, last_seen_uid).await?;
+        // `UID n:*` always matches the highest UID, even when it's below n.
+        new_uids.retain(|&uid| uid > last_seen_uid);
+        let Some(&max_uid) = new_uids.last() else {
+            tokio::time::sleep(poll_interval).await;
+            continue;
+        };
+        last_seen_uid = max_uid;
+
+        // Fetch all new messages in one round-trip
+        let mut messages = imap::fetch_messages(&mut client, "INBOX", &new_uids).await?;
+        messages.sort_unstable_by_key(|m| m.uid);
+
+        for msg in messages {
             // Apply filters
-            if let Some(from_pat) = from_filter {
-                let from_lower = msg.from_addr.to_lowercase();
-                let pat_lower = from_pat.to_lowercase();
+            if let Some(pat_lower) = &from_filter_lower {
                 // Match domain or full address
-                if !from_lower.contains(&pat_lower) {
+                if !msg.from_addr.to_lowercase().contains(pat_lower.as_str()) {
                     continue;
                 }
             }
 
-            if let Some(subj_pat) = subject_filter {
-                let subj_lower = msg.subject.to_lowercase();
-                let pat_lower = subj_pat.to_lowercase();
-                if !subj_lower.contains(&pat_lower) {
+            if let Some(pat_lower) = &subject_filter_lower {
+                if !msg.subject.to_lowercase().contains(pat_lower.as_str()) {
                     continue;
                 }
             }
@@ -124,11 +121,7 @@ pub async fn run(
 
 /// Get the current maximum UID in INBOX.
 async fn get_max_uid(client: &mut imap::ImapClient) -> Result<u32> {
-    let uid_set = client
-        .session_mut()
-        .uid_search("ALL")
-        .await
-        .map_err(|e| anyhow::anyhow!("UID SEARCH ALL: {e}"))?;
+    let uid_set = client.uid_search("ALL").await?;
 
     Ok(uid_set.into_iter().max().unwrap_or(0))
 }
@@ -136,11 +129,7 @@ async fn get_max_uid(client: &mut imap::ImapClient) -> Result<u32> {
 /// Search for UIDs greater than `since_uid` in the currently selected mailbox.
 async fn search_new_uids(client: &mut imap::ImapClient, since_uid: u32) -> Result<Vec<u32>> {
     let query = format!("UID {}:*", since_uid + 1);
-    let uid_set = client
-        .session_mut()
-        .uid_search(&query)
-        .await
-        .map_err(|e| anyhow::anyhow!("UID SEARCH {query}: {e}"))?;
+    let uid_set = client.uid_search(&query).await?;
 
     let mut uids: Vec<u32> = uid_set.into_iter().collect();
     uids.sort_unstable();
@@ -41,11 +41,21 @@ pub fn setup_credentials(
     backend: CredentialBackend,
 ) -> Result<(Database, AccountWithCredentials)> {
     let db = Database::open_default().context("failed to open database")?;
+    let creds = resolve_credentials(&db, account_arg, backend)?;
+    Ok((db, creds))
+}
+
+/// Get the passphrase, resolve account, and return credentials from an
+/// already-open database. For long-lived callers (the MCP server) that keep
+/// one connection for the whole session.
+pub fn resolve_credentials(
+    db: &Database,
+    account_arg: Option<&str>,
+    backend: CredentialBackend,
+) -> Result<AccountWithCredentials> {
     let passphrase =
         credential_store::get_or_create_passphrase(backend).context("credential store error")?;
-    let acct = resolve_account(&db, account_arg)?;
-    let creds = db
-        .get_account_with_credentials(&acct.id, &passphrase)
-        .context("failed to decrypt credentials")?;
-    Ok((db, creds))
+    let acct = resolve_account(db, account_arg)?;
+    db.get_account_with_credentials(&acct.id, &passphrase)
+        .context("failed to decrypt credentials")
 }
@@ -34,7 +34,7 @@ pub fn parse_until(input: &str) -> Result<String> {
                 "w" => Duration::weeks(n),
                 _ => bail!("unknown time unit: '{unit}' (use m/h/d/w)"),
             };
-            let target = Utc::now() + duration;
+            let target = (now + duration).with_timezone(&Utc);
             return Ok(target.format("%Y-%m-%dT%H:%M:%S").to_string());
         }
     }
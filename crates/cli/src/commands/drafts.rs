@@ -43,14 +43,15 @@ fn build_rfc822_draft(
         .write_to_string()
         .context("failed to build RFC822 message")?;
 
-    // Extract the Message-ID from the generated RFC822
+    // Extract the Message-ID from the generated RFC822 header block,
+    // stopping at the blank line before the body.
     let message_id = rfc822
         .lines()
-        .find(|l| l.to_lowercase().starts_with("message-id:"))
-        .map(|l| {
-            l.split_once(':')
-                .map(|(_, v)| v.trim().to_string())
-                .unwrap_or_default()
+        .take_while(|l| !l.is_empty())
+        .find_map(|l| {
+            let (name, value) = l.split_once(':')?;
+            name.eq_ignore_ascii_case("message-id")
+                .then(|| value.trim().to_string())
         })
         .unwrap_or_default();
 
@@ -442,6 +443,10 @@ pub async fn run_send(
         None
     };
 
+    // IMAP connection (and resolved Drafts folder) used to fetch the draft,
+    // kept open for the delete + copy-to-Sent step after sending.
+    let mut draft_session: Option<(imap::ImapClient, String)> = None;
+
     // ── Fetch draft content from IMAP (source of truth) ──
     let (to_addr, subject, text_body, html_body, cc_addr, bcc_addr, reply_to) =
         if let Some(uid) = imap_uid {
@@ -475,6 +480,7 @@ pub async fn run_send(
                     .ok_or_else(|| {
                         anyhow::anyhow!("draft UID {uid} not found in IMAP {drafts_folder}")
                     })?;
+                draft_session = Some((client, drafts_folder));
 
                 (
                     msg.to_addr,
@@ -515,53 +521,40 @@ pub async fn run_send(
     .context("failed to send draft")?;
 
     // ── Delete from IMAP Drafts folder + Copy to Sent ──
-    if let Some(uid) = imap_uid {
-        if !acct.imap_host.is_empty() {
-            match imap::connect(&creds).await {
-                Ok(mut client) => {
-                    let drafts_folder = detect_drafts_folder(&mut client, &db, &acct.id)
-                        .await
-                        .map_err(|e| anyhow::anyhow!("drafts folder detection failed: {e}"))?
-                        .unwrap_or_else(|| "Drafts".to_string());
-
-                    if let Err(e) = imap::delete_message(&mut client, &drafts_folder, uid).await {
-                        warn!(
-                            "failed to delete draft from IMAP {} (UID {uid}): {e}",
-                            drafts_folder
-                        );
-                    }
+    // Reuses the session that fetched the draft rather than logging in again.
+    if let (Some(uid), Some((mut client, drafts_folder))) = (imap_uid, draft_session.take()) {
+        if let Err(e) = imap::delete_message(&mut client, &drafts_folder, uid).await {
+            warn!(
+                "failed to delete draft from IMAP {} (UID {uid}): {e}",
+                drafts_folder
+            );
+        }
 
-                    // Copy to Sent folder
-                    let from = if let Some(ref display) = creds.account.display_name {
-                        format!("{display} <{}>", creds.account.username)
-                    } else {
-                        creds.account.username.clone()
-                    };
-                    if let Ok((rfc822_bytes, _)) = build_rfc822_draft(
-                        &from,
-                        &to_addr,
-                        Some(&subject),
-                        text_body.as_deref(),
-                        cc_addr.as_deref(),
-                        None,
-                    ) {
-                        let sent_result = detect_sent_folder(&mut client, &db, &acct.id).await;
-                        if let Ok(Some(sent_folder)) = sent_result {
-                            if let Err(e) = imap::append_message(
-                                &mut client,
-                                &sent_folder,
-                                "(\\Seen)",
-                                &rfc822_bytes,
-                            )
-                            .await
-                            {
-                                warn!("failed to copy sent message to {sent_folder}: {e}");
-                            }
-                        }
-                    }
-                }
-                Err(e) => {
-                    warn!("failed to connect to IMAP to clean up sent draft: {e}");
+        // Copy to Sent folder
+        let from = if let Some(ref display) = creds.account.display_name {
+            format!("{display} <{}>", creds.account.username)
+        } else {
+            creds.account.username.clone()
+        };
+        if let Ok((rfc822_bytes, _)) = build_rfc822_draft(
+            &from,
+            &to_addr,
+            Some(&subject),
+            text_body.as_deref(),
+            cc_addr.as_deref(),
+            None,
+        ) {
+            let sent_result = detect_sent_folder(&mut client, &db, &acct.id).await;
+            if let Ok(Some(sent_folder)) = sent_result {
+                if let Err(e) = imap::append_message(
+                    &mut client,
+                    &sent_folder,
+                    "(\\Seen)",
+                    &rfc822_bytes,
+                )
+                .await
+                {
+                    warn!("failed to copy sent message to {sent_folder}: {e}");
                 }
             }
         }
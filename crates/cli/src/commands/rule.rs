@@ -2,6 +2,7 @@
 // Licensed under FSL-1.1-ALv2 (see LICENSE)
 
 use std::collections::HashMap;
+use std::sync::LazyLock;
 
 use anyhow::{Context, Result, bail};
 use envelope_email_store::credential_store::CredentialBackend;
@@ -11,6 +12,10 @@ use tracing::info;
 
 use super::common::setup_credentials;
 
+/// HTTP client shared by every webhook action in the process, so a batch
+/// that matches many messages reuses one connection pool and TLS config.
+static WEBHOOK_CLIENT: LazyLock<reqwest::Client> = LazyLock::new(reqwest::Client::new);
+
 /// Parse a `key=value` score pair (e.g. `urgent=0.7`).
 fn parse_score_filter(s: &str) -> Result<(String, f64)> {
     let (key, val) = s
@@ -49,7 +54,48 @@ fn build_message_context(
     db: &envelope_email_store::Database,
     account_id: &str,
 ) -> Result<MessageContext> {
-    let message_id = msg.message_id.as_deref().unwrap_or("");
+    context_from_headers(
+        msg.message_id.as_deref(),
+        &msg.from_addr,
+        &msg.to_addr,
+        &msg.subject,
+        db,
+        account_id,
+    )
+}
+
+/// Build a `MessageContext` from an inbox summary, without downloading the
+/// message. ENVELOPE data is normalized to the parsed-message form: the
+/// Message-ID without angle brackets (the key tags and scores are stored
+/// under) and only the first sender and recipient.
+fn summary_message_context(
+    summary: &envelope_email_store::MessageSummary,
+    db: &envelope_email_store::Database,
+    account_id: &str,
+) -> Result<MessageContext> {
+    let first = |addrs: &str| addrs.split(", ").next().unwrap_or("").to_string();
+    context_from_headers(
+        summary
+            .message_id
+            .as_deref()
+            .map(|mid| mid.trim_matches(|c| c == '<' || c == '>')),
+        &first(&summary.from_addr),
+        &first(&summary.to_addr),
+        &summary.subject,
+        db,
+        account_id,
+    )
+}
+
+fn context_from_headers(
+    message_id: Option<&str>,
+    from_addr: &str,
+    to_addr: &str,
+    subject: &str,
+    db: &envelope_email_store::Database,
+    account_id: &str,
+) -> Result<MessageContext> {
+    let message_id = message_id.unwrap_or("");
 
     let tags: Vec<String> = if !message_id.is_empty() {
         db.get_tags(account_id, message_id)
@@ -72,13 +118,13 @@ fn build_message_context(
     };
 
     let contact_tags = db
-        .get_contact_tags(account_id, &msg.from_addr)
+        .get_contact_tags(account_id, from_addr)
         .context("failed to get contact tags")?;
 
     Ok(MessageContext {
-        from_addr: msg.from_addr.clone(),
-        to_addr: msg.to_addr.clone(),
-        subject: msg.subject.clone(),
+        from_addr: from_addr.to_string(),
+        to_addr: to_addr.to_string(),
+        subject: subject.to_string(),
         tags,
         scores,
         contact_tags,
@@ -342,42 +388,38 @@ pub async fn run_apply(
         return Ok(());
     }
 
+    // Parse each rule once up front rather than once per message. Rules whose
+    // stored JSON doesn't parse are skipped, as before.
+    let compiled_rules: Vec<(&_, rules::MatchExpr, Action)> = enabled_rules
+        .iter()
+        .filter_map(|rule| {
+            let match_expr = serde_json::from_str(&rule.match_expr).ok()?;
+            let action = serde_json::from_str(&rule.action).ok()?;
+            Some((rule, match_expr, action))
+        })
+        .collect();
+
     let total = summaries.len();
     let mut actions_taken = 0u32;
     let mut action_log: Vec<serde_json::Value> = Vec::new();
 
-    // We need to process messages one at a time because actions (move/delete)
-    // change UIDs. Collect UIDs first, then fetch full messages individually.
-    let uids: Vec<u32> = summaries.iter().map(|s| s.uid).collect();
-
-    for (i, &uid) in uids.iter().enumerate() {
-        // Fetch the full message for rule evaluation
-        let msg = match imap::fetch_message(&mut client, folder, uid).await {
-            Ok(Some(m)) => m,
-            Ok(None) => continue, // message may have been moved/deleted by a prior action
-            Err(_) => continue,
-        };
+    // Rules only look at the sender, recipient, subject and stored
+    // tags/scores, all of which the inbox summaries already carry, so no
+    // message bodies are downloaded. UIDs are stable within a mailbox, so a
+    // move/delete on one message doesn't invalidate the others.
+    for (i, summary) in summaries.iter().enumerate() {
+        let uid = summary.uid;
 
-        let ctx = build_message_context(&msg, &db, &account_id)?;
+        let ctx = summary_message_context(summary, &db, &account_id)?;
 
         // Evaluate all enabled rules (in priority order, stop on first stop rule)
-        for rule in &enabled_rules {
-            let match_expr: rules::MatchExpr = match serde_json::from_str(&rule.match_expr) {
-                Ok(e) => e,
-                Err(_) => continue,
-            };
-
-            if !rules::evaluate(&match_expr, &ctx) {
+        for (rule, match_expr, action) in &compiled_rules {
+            if !rules::evaluate(match_expr, &ctx) {
                 continue;
             }
 
-            let action: Action = match serde_json::from_str(&rule.action) {
-                Ok(a) => a,
-                Err(_) => continue,
-            };
-
             // Execute the action
-            let action_result = execute_action(&mut client, &action, uid, folder, Some(&rule.name), Some(&ctx)).await;
+            let action_result = execute_action(&mut client, action, uid, folder, Some(&rule.name), Some(&ctx)).await;
 
             match &action_result {
                 Ok(desc) => {
@@ -499,10 +541,9 @@ async fn execute_action(
                     "subject": ctx.map(|c| c.subject.as_str()).unwrap_or(""),
                 }
             });
-            let http = reqwest::Client::new();
             let body = serde_json::to_vec(&payload)
                 .map_err(|e| anyhow::anyhow!("failed to serialize webhook payload: {e}"))?;
-            match http
+            match WEBHOOK_CLIENT
                 .post(url.as_str())
                 .header("Content-Type", "application/json")
                 .body(body)
@@ -648,6 +689,29 @@ mod tests {
         assert!(parse_score_filter("nope").is_err());
         assert!(parse_score_filter("bad=xyz").is_err());
     }
+
+    #[test]
+    fn summary_context_matches_parsed_message_form() {
+        let db = envelope_email_store::Database::open_memory().unwrap();
+        db.add_tag("acct1", "msg@test", "newsletter", Some(7), Some("INBOX"))
+            .unwrap();
+        let summary = envelope_email_store::MessageSummary {
+            uid: 7,
+            message_id: Some("<msg@test>".to_string()),
+            from_addr: "news@example.com".to_string(),
+            to_addr: "me@example.com, other@example.com".to_string(),
+            subject: "Weekly".to_string(),
+            date: None,
+            flags: vec![],
+            size: 0,
+        };
+
+        let ctx = summary_message_context(&summary, &db, "acct1").unwrap();
+        assert_eq!(ctx.from_addr, "news@example.com");
+        assert_eq!(ctx.to_addr, "me@example.com");
+        assert_eq!(ctx.subject, "Weekly");
+        assert_eq!(ctx.tags, vec!["newsletter".to_string()]);
+    }
 }
 
 /// Export rules as a Sieve script.
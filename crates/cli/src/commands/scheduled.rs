@@ -2,12 +2,29 @@
 // Licensed under FSL-1.1-ALv2 (see LICENSE)
 
 use anyhow::{Context, Result, bail};
-use envelope_email_store::Database;
 use envelope_email_store::credential_store::CredentialBackend;
+use envelope_email_store::{Database, Draft, DraftStatus};
 
 use super::common::resolve_account;
 
-/// List scheduled messages (drafts with send_after set, still in draft status).
+/// Scheduled drafts for one account: those still waiting to send, plus those
+/// the scheduler gave up on (`failed`), so a send that never went out stays
+/// visible.
+fn scheduled_drafts(db: &Database, account_id: &str) -> Result<Vec<Draft>> {
+    let mut drafts = Vec::new();
+    for status in ["draft", "failed"] {
+        drafts.extend(
+            db.list_drafts(account_id, Some(status), 100, 0)
+                .context("failed to list drafts")?
+                .into_iter()
+                .filter(|d| d.send_after.is_some()),
+        );
+    }
+    Ok(drafts)
+}
+
+/// List scheduled messages (drafts with send_after set that are still pending
+/// or whose scheduled send failed).
 pub fn run_list(account: Option<&str>, json: bool, _backend: CredentialBackend) -> Result<()> {
     let db = Database::open_default().context("failed to open database")?;
 
@@ -20,25 +37,14 @@ pub fn run_list(account: Option<&str>, json: bool, _backend: CredentialBackend)
         None => None,
     };
 
-    // Query drafts with send_after set and status = 'draft'
     let drafts = if let Some(ref acct_id) = account_id {
-        db.list_drafts(acct_id, Some("draft"), 100, 0)
-            .context("failed to list drafts")?
-            .into_iter()
-            .filter(|d| d.send_after.is_some())
-            .collect::<Vec<_>>()
+        scheduled_drafts(&db, acct_id)?
     } else {
         // List all accounts and aggregate
         let accounts = db.list_accounts().context("failed to list accounts")?;
         let mut all = Vec::new();
         for acct in &accounts {
-            let mut drafts = db
-                .list_drafts(&acct.id, Some("draft"), 100, 0)
-                .context("failed to list drafts")?
-                .into_iter()
-                .filter(|d| d.send_after.is_some())
-                .collect::<Vec<_>>();
-            all.append(&mut drafts);
+            all.append(&mut scheduled_drafts(&db, &acct.id)?);
         }
         all
     };
@@ -53,6 +59,8 @@ pub fn run_list(account: Option<&str>, json: bool, _backend: CredentialBackend)
                     "to": d.to_addr,
                     "subject": d.subject,
                     "send_after": d.send_after,
+                    "status": d.status.as_str(),
+                    "send_attempts": d.send_attempts,
                     "created_at": d.created_at,
                 })
             })
@@ -65,10 +73,10 @@ pub fn run_list(account: Option<&str>, json: bool, _backend: CredentialBackend)
         }
 
         println!(
-            "{:<36}  {:<28}  {:<22}  {}",
-            "DRAFT ID", "TO", "SEND AT", "SUBJECT"
+            "{:<36}  {:<28}  {:<22}  {:<16}  {}",
+            "DRAFT ID", "TO", "SEND AT", "STATUS", "SUBJECT"
         );
-        println!("{}", "-".repeat(110));
+        println!("{}", "-".repeat(128));
         for d in &drafts {
             let subject = d.subject.as_deref().unwrap_or("-");
             let subject_display = if subject.len() > 30 {
@@ -82,12 +90,28 @@ pub fn run_list(account: Option<&str>, json: bool, _backend: CredentialBackend)
                 d.to_addr.clone()
             };
             let send_at = d.send_after.as_deref().unwrap_or("-");
+            let status = match d.status {
+                DraftStatus::Failed => {
+                    format!("failed ({} tries)", d.send_attempts)
+                }
+                _ if d.send_attempts > 0 => format!("retry {}", d.send_attempts),
+                _ => "pending".to_string(),
+            };
             println!(
-                "{:<36}  {:<28}  {:<22}  {}",
-                d.id, to_display, send_at, subject_display,
+                "{:<36}  {:<28}  {:<22}  {:<16}  {}",
+                d.id, to_display, send_at, status, subject_display,
             );
         }
         println!("\n{} scheduled message(s)", drafts.len());
+        let failed = drafts
+            .iter()
+            .filter(|d| d.status == DraftStatus::Failed)
+            .count();
+        if failed > 0 {
+            println!(
+                "{failed} failed and will not be retried; `envelope scheduled cancel <id>` clears one"
+            );
+        }
     }
 
     Ok(())
@@ -8,10 +8,19 @@ use async_imap::extensions::idle::IdleResponse;
 use envelope_email_store::models::Event;
 use envelope_email_store::CredentialBackend;
 use futures_util::StreamExt;
+use tokio::task::JoinSet;
 use tracing::{info, warn};
 
 use super::common::setup_credentials;
 
+/// Cap on webhook POSTs in flight at once. Deliveries beyond it are dropped
+/// (and logged) rather than awaited, so a slow endpoint never stalls IDLE.
+const MAX_INFLIGHT_WEBHOOKS: usize = 8;
+/// Upper bound on a single webhook POST, so a hung endpoint frees its slot.
+const WEBHOOK_TIMEOUT: Duration = Duration::from_secs(10);
+/// How long shutdown waits for in-flight webhook POSTs to finish.
+const WEBHOOK_DRAIN_TIMEOUT: Duration = Duration::from_secs(5);
+
 #[tokio::main]
 pub async fn run(
     folder: &str,
@@ -24,7 +33,16 @@ pub async fn run(
     let (db, creds) = setup_credentials(account, backend)?;
     let account_id = creds.account.id.clone();
 
-    let http_client = webhook.map(|_| reqwest::Client::new());
+    let http_client = match webhook {
+        Some(_) => Some(
+            reqwest::Client::builder()
+                .timeout(WEBHOOK_TIMEOUT)
+                .build()
+                .context("failed to build webhook HTTP client")?,
+        ),
+        None => None,
+    };
+    let mut webhooks = JoinSet::new();
 
     if !json {
         eprintln!(
@@ -108,12 +126,19 @@ pub async fn run(
                         .unwrap_or_else(|_| "{}".to_string());
                     println!("{json_line}");
 
-                    // Webhook delivery (fire-and-forget)
+                    // Webhook delivery (background, bounded)
                     if let (Some(url), Some(client)) = (webhook, http_client.as_ref()) {
+                        while webhooks.try_join_next().is_some() {}
+                        if webhooks.len() >= MAX_INFLIGHT_WEBHOOKS {
+                            warn!(
+                                "{MAX_INFLIGHT_WEBHOOKS} webhook POSTs in flight, skipping UID {uid}"
+                            );
+                            continue;
+                        }
                         let url = url.to_string();
                         let client = client.clone();
                         let body = json_line.clone();
-                        tokio::spawn(async move {
+                        webhooks.spawn(async move {
                             if let Err(e) = client
                                 .post(&url)
                                 .header("Content-Type", "application/json")
@@ -157,6 +182,12 @@ pub async fn run(
         }
     }
 
+    // Give in-flight webhook deliveries a chance to land before exiting.
+    let drain = async { while webhooks.join_next().await.is_some() {} };
+    if tokio::time::timeout(WEBHOOK_DRAIN_TIMEOUT, drain).await.is_err() {
+        warn!("abandoning {} in-flight webhook POST(s) on shutdown", webhooks.len());
+    }
+
     Ok(())
 }
 
@@ -1301,7 +1301,10 @@ fn main() {
                 mcp::print_config();
                 Ok(())
             } else {
-                tokio::runtime::Builder::new_multi_thread()
+                // The server handles one JSON-RPC request at a time, so a
+                // single-threaded runtime is enough; a multi-thread one just
+                // parks a worker per core for the life of the process.
+                tokio::runtime::Builder::new_current_thread()
                     .enable_all()
                     .build()
                     .expect("failed to create tokio runtime")
@@ -9,7 +9,9 @@
 use envelope_email_store::{CredentialBackend, Database};
 use serde::{Deserialize, Serialize};
 use serde_json::{Value, json};
+use std::borrow::Cow;
 use std::io::{self, BufRead, Write};
+use std::sync::LazyLock;
 
 // ── JSON-RPC types ──────────────────────────────────────────────────
 
@@ -28,8 +30,9 @@ struct JsonRpcResponse {
     jsonrpc: String,
     #[serde(skip_serializing_if = "Option::is_none")]
     id: Option<Value>,
+    /// Borrowed for the static protocol documents, owned for tool results.
     #[serde(skip_serializing_if = "Option::is_none")]
-    result: Option<Value>,
+    result: Option<Cow<'static, Value>>,
     #[serde(skip_serializing_if = "Option::is_none")]
     error: Option<JsonRpcError>,
 }
@@ -47,7 +50,16 @@ impl JsonRpcResponse {
         Self {
             jsonrpc: "2.0".to_string(),
             id,
-            result: Some(result),
+            result: Some(Cow::Owned(result)),
+            error: None,
+        }
+    }
+
+    fn success_static(id: Option<Value>, result: &'static Value) -> Self {
+        Self {
+            jsonrpc: "2.0".to_string(),
+            id,
+            result: Some(Cow::Borrowed(result)),
             error: None,
         }
     }
@@ -68,6 +80,11 @@ impl JsonRpcResponse {
 
 // ── MCP protocol types ──────────────────────────────────────────────
 
+/// The protocol documents never change within a process, so build each one
+/// once and serialize it by reference.
+static SERVER_INFO: LazyLock<Value> = LazyLock::new(server_info);
+static TOOL_LIST: LazyLock<Value> = LazyLock::new(tool_list);
+
 fn server_info() -> Value {
     json!({
         "protocolVersion": "2024-11-05",
@@ -243,33 +260,37 @@ fn tool_list() -> Value {
 // ── Tool dispatch ───────────────────────────────────────────────────
 
 async fn handle_tool_call(
+    db: &Database,
     tool_name: &str,
     params: &Value,
     backend: CredentialBackend,
 ) -> Result<Value, String> {
     match tool_name {
-        "accounts" => handle_accounts(backend).await,
-        "inbox" => handle_inbox(params, backend).await,
-        "read" => handle_read(params, backend).await,
-        "search" => handle_search(params, backend).await,
-        "send" => handle_send(params, backend).await,
-        "reply" => handle_reply(params, backend).await,
-        "move_message" => handle_move(params, backend).await,
-        "flag" => handle_flag(params, backend).await,
-        "folders" => handle_folders(params, backend).await,
-        "tag" => handle_tag(params, backend).await,
-        "contacts" => handle_contacts(params, backend).await,
+        "accounts" => handle_accounts(db).await,
+        "inbox" => handle_inbox(db, params, backend).await,
+        "read" => handle_read(db, params, backend).await,
+        "search" => handle_search(db, params, backend).await,
+        "send" => handle_send(db, params, backend).await,
+        "reply" => handle_reply(db, params, backend).await,
+        "move_message" => handle_move(db, params, backend).await,
+        "flag" => handle_flag(db, params, backend).await,
+        "folders" => handle_folders(db, params, backend).await,
+        "tag" => handle_tag(db, params, backend).await,
+        "contacts" => handle_contacts(db, params, backend).await,
         _ => Err(format!("unknown tool: {tool_name}")),
     }
 }
 
-async fn handle_accounts(_backend: CredentialBackend) -> Result<Value, String> {
-    let db = Database::open_default().map_err(|e| e.to_string())?;
+async fn handle_accounts(db: &Database) -> Result<Value, String> {
     let accounts = db.list_accounts().map_err(|e| e.to_string())?;
     serde_json::to_value(&accounts).map_err(|e| e.to_string())
 }
 
-async fn handle_inbox(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_inbox(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let account_arg = params.get("account").and_then(|v| v.as_str());
     let folder = params
         .get("folder")
@@ -280,9 +301,8 @@ async fn handle_inbox(params: &Value, backend: CredentialBackend) -> Result<Valu
         .and_then(|v| v.as_u64())
         .unwrap_or(25) as usize;
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -295,7 +315,11 @@ async fn handle_inbox(params: &Value, backend: CredentialBackend) -> Result<Valu
     serde_json::to_value(&messages).map_err(|e| e.to_string())
 }
 
-async fn handle_read(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_read(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let uid = params
         .get("uid")
         .and_then(|v| v.as_u64())
@@ -306,9 +330,8 @@ async fn handle_read(params: &Value, backend: CredentialBackend) -> Result<Value
         .unwrap_or("INBOX");
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -322,7 +345,11 @@ async fn handle_read(params: &Value, backend: CredentialBackend) -> Result<Value
     serde_json::to_value(&message).map_err(|e| e.to_string())
 }
 
-async fn handle_search(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_search(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let query = params
         .get("query")
         .and_then(|v| v.as_str())
@@ -337,9 +364,8 @@ async fn handle_search(params: &Value, backend: CredentialBackend) -> Result<Val
         .unwrap_or(25) as usize;
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -353,7 +379,11 @@ async fn handle_search(params: &Value, backend: CredentialBackend) -> Result<Val
     serde_json::to_value(&messages).map_err(|e| e.to_string())
 }
 
-async fn handle_send(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_send(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let to = params
         .get("to")
         .and_then(|v| v.as_str())
@@ -370,9 +400,8 @@ async fn handle_send(params: &Value, backend: CredentialBackend) -> Result<Value
     let reply_to = params.get("reply_to").and_then(|v| v.as_str());
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let message_id = envelope_email_transport::smtp::SmtpSender::send(
         &creds,
@@ -394,7 +423,11 @@ async fn handle_send(params: &Value, backend: CredentialBackend) -> Result<Value
     Ok(json!({ "sent": true, "message_id": message_id }))
 }
 
-async fn handle_reply(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_reply(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let uid = params
         .get("uid")
         .and_then(|v| v.as_u64())
@@ -414,9 +447,8 @@ async fn handle_reply(params: &Value, backend: CredentialBackend) -> Result<Valu
         .unwrap_or("INBOX");
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -461,7 +493,11 @@ async fn handle_reply(params: &Value, backend: CredentialBackend) -> Result<Valu
     Ok(json!({ "sent": true, "message_id": message_id, "in_reply_to": headers.in_reply_to }))
 }
 
-async fn handle_move(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_move(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let uid = params
         .get("uid")
         .and_then(|v| v.as_u64())
@@ -476,9 +512,8 @@ async fn handle_move(params: &Value, backend: CredentialBackend) -> Result<Value
         .unwrap_or("INBOX");
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -491,7 +526,11 @@ async fn handle_move(params: &Value, backend: CredentialBackend) -> Result<Value
     Ok(json!({ "moved": true, "uid": uid, "from": from_folder, "to": to_folder }))
 }
 
-async fn handle_flag(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_flag(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let uid = params
         .get("uid")
         .and_then(|v| v.as_u64())
@@ -510,9 +549,8 @@ async fn handle_flag(params: &Value, backend: CredentialBackend) -> Result<Value
         .unwrap_or("INBOX");
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -535,12 +573,15 @@ async fn handle_flag(params: &Value, backend: CredentialBackend) -> Result<Value
     Ok(json!({ "flagged": true, "uid": uid, "action": action, "flag": flag }))
 }
 
-async fn handle_folders(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_folders(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (_db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     let mut client = envelope_email_transport::imap::connect(&creds)
         .await
@@ -553,7 +594,11 @@ async fn handle_folders(params: &Value, backend: CredentialBackend) -> Result<Va
     serde_json::to_value(&stats).map_err(|e| e.to_string())
 }
 
-async fn handle_tag(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_tag(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let uid = params
         .get("uid")
         .and_then(|v| v.as_u64())
@@ -564,9 +609,8 @@ async fn handle_tag(params: &Value, backend: CredentialBackend) -> Result<Value,
         .unwrap_or("INBOX");
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     // Fetch message to get Message-ID
     let mut client = envelope_email_transport::imap::connect(&creds)
@@ -630,16 +674,19 @@ async fn handle_tag(params: &Value, backend: CredentialBackend) -> Result<Value,
     }))
 }
 
-async fn handle_contacts(params: &Value, backend: CredentialBackend) -> Result<Value, String> {
+async fn handle_contacts(
+    db: &Database,
+    params: &Value,
+    backend: CredentialBackend,
+) -> Result<Value, String> {
     let action = params
         .get("action")
         .and_then(|v| v.as_str())
         .ok_or("action is required")?;
     let account_arg = params.get("account").and_then(|v| v.as_str());
 
-    let (db, creds) =
-        crate::commands::common::setup_credentials(account_arg, backend)
-            .map_err(|e: anyhow::Error| e.to_string())?;
+    let creds = crate::commands::common::resolve_credentials(db, account_arg, backend)
+        .map_err(|e: anyhow::Error| e.to_string())?;
 
     match action {
         "list" => {
@@ -743,11 +790,20 @@ pub fn print_config() {
 // ── Main loop ───────────────────────────────────────────────────────
 
 pub async fn run(backend: CredentialBackend) -> anyhow::Result<()> {
-    let stdin = io::stdin();
+    // One connection for the whole session rather than one per tool call.
+    let db = Database::open_default()?;
+    let mut input = io::stdin().lock();
     let stdout = io::stdout();
-
-    for line in stdin.lock().lines() {
-        let line = line?;
+    // Reused for every request line instead of allocating one per line.
+    let mut line = String::new();
+    // Stands in for a missing `arguments` object without allocating.
+    let no_arguments = json!({});
+
+    loop {
+        line.clear();
+        if input.read_line(&mut line)? == 0 {
+            break;
+        }
         if line.trim().is_empty() {
             continue;
         }
@@ -769,11 +825,11 @@ pub async fn run(backend: CredentialBackend) -> anyhow::Result<()> {
         };
 
         let response = match request.method.as_str() {
-            "initialize" => JsonRpcResponse::success(request.id, server_info()),
+            "initialize" => JsonRpcResponse::success_static(request.id, &SERVER_INFO),
 
             "notifications/initialized" => continue,
 
-            "tools/list" => JsonRpcResponse::success(request.id, tool_list()),
+            "tools/list" => JsonRpcResponse::success_static(request.id, &TOOL_LIST),
 
             "tools/call" => {
                 let tool_name = request
@@ -781,13 +837,11 @@ pub async fn run(backend: CredentialBackend) -> anyhow::Result<()> {
                     .get("name")
                     .and_then(|v| v.as_str())
                     .unwrap_or("");
-                let arguments = request
-                    .params
-                    .get("arguments")
-                    .cloned()
-                    .unwrap_or(json!({}));
+                // Borrow the arguments from the parsed request; handlers
+                // only read them.
+                let arguments = request.params.get("arguments").unwrap_or(&no_arguments);
 
-                match handle_tool_call(tool_name, &arguments, backend.clone()).await {
+                match handle_tool_call(&db, tool_name, arguments, backend.clone()).await {
                     Ok(result) => JsonRpcResponse::success(
                         request.id,
                         json!({
@@ -7,6 +7,8 @@
 //! no runtime file dependencies — the dashboard HTML/CSS/JS ships inside
 //! the executable.
 
+use std::borrow::Cow;
+
 use rust_embed::RustEmbed;
 
 #[derive(RustEmbed)]
@@ -14,7 +16,9 @@ use rust_embed::RustEmbed;
 pub struct Assets;
 
 impl Assets {
-    pub fn get_file(path: &str) -> Option<Vec<u8>> {
-        Self::get(path).map(|f| f.data.into_owned())
+    /// Contents of an embedded file. Release builds borrow the bytes baked
+    /// into the binary, so serving an asset doesn't copy it.
+    pub fn get_file(path: &str) -> Option<Cow<'static, [u8]>> {
+        Self::get(path).map(|f| f.data)
     }
 }
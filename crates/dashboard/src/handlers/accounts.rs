@@ -7,6 +7,7 @@ use axum::Json;
 use axum::extract::{Path, State};
 use axum::http::StatusCode;
 use axum::response::IntoResponse;
+use envelope_email_transport::SmtpSender;
 use serde::{Deserialize, Serialize};
 use serde_json::json;
 
@@ -115,7 +116,10 @@ pub async fn delete(
 ) -> impl IntoResponse {
     let db = state.db.lock().await;
     match db.delete_account(&id) {
-        Ok(true) => Json(json!({ "deleted": id })).into_response(),
+        Ok(true) => {
+            SmtpSender::forget_account(&id);
+            Json(json!({ "deleted": id })).into_response()
+        }
         Ok(false) => (StatusCode::NOT_FOUND, "account not found").into_response(),
         Err(e) => (
             StatusCode::INTERNAL_SERVER_ERROR,
@@ -64,7 +64,7 @@ pub async fn send(
     Path(account_id): Path<String>,
     Json(req): Json<ComposeRequest>,
 ) -> impl IntoResponse {
-    let (_client, creds) = match state.get_or_create_imap(&account_id).await {
+    let creds = match state.credentials(&account_id).await {
         Ok(c) => c,
         Err(e) => {
             return (StatusCode::BAD_GATEWAY, format!("resolve account: {e}")).into_response();
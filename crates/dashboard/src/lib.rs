@@ -16,12 +16,16 @@ pub mod handlers;
 pub mod state;
 
 use std::net::SocketAddr;
+use std::time::Duration;
 
 use axum::Router;
 use axum::http::{HeaderValue, Method, StatusCode, header};
 use axum::response::{Html, IntoResponse, Response};
 use axum::routing::{delete, get, post};
+use envelope_email_store::models::Draft;
 use envelope_email_store::{CredentialBackend, Database};
+use futures_util::StreamExt;
+use tokio::sync::watch;
 use tower_http::cors::{AllowOrigin, CorsLayer};
 use tracing::info;
 
@@ -31,7 +35,7 @@ use crate::state::AppState;
 /// Start the dashboard server on the given port.
 ///
 /// Opens the default database, builds an [`AppState`] with an IMAP connection
-/// pool, mounts the router, and blocks serving until shutdown.
+/// pool, mounts the router, and blocks serving until Ctrl-C.
 pub async fn serve(port: u16) -> anyhow::Result<()> {
     serve_with_backend(port, CredentialBackend::File).await
 }
@@ -112,26 +116,107 @@ pub async fn serve_with_backend(
 
     info!("dashboard listening on http://localhost:{port}");
     println!("Envelope dashboard running at http://localhost:{port}");
-    println!("Background unsnooze + scheduled-send sweep running every 60s");
-
-    // Spawn background ticker (checks every 60s for due snoozes and scheduled sends)
-    tokio::spawn(async move {
-        let ticker_state = state;
-        let mut interval = tokio::time::interval(std::time::Duration::from_secs(60));
-        loop {
-            interval.tick().await;
-            if let Err(e) = run_unsnooze_sweep(&ticker_state).await {
-                tracing::warn!("unsnooze sweep error: {e}");
-            }
-            if let Err(e) = run_scheduled_send_sweep(&ticker_state).await {
-                tracing::warn!("scheduled send sweep error: {e}");
-            }
-        }
-    });
+    println!("Background unsnooze + scheduled-send sweep running (at most 60s apart)");
+
+    // Spawn background sweeper: runs when the next snooze or scheduled send
+    // comes due, and at least every SWEEP_INTERVAL to pick up work created by
+    // other processes (the CLI writes to the same database).
+    let (stop_sweeper, stop_rx) = watch::channel(false);
+    let mut sweeper = tokio::spawn(run_background_sweeps(state, stop_rx));
 
-    axum::serve(listener, app)
+    let served = axum::serve(listener, app)
+        .with_graceful_shutdown(shutdown_signal())
         .await
-        .map_err(|e| anyhow::anyhow!("server error: {e}"))
+        .map_err(|e| anyhow::anyhow!("server error: {e}"));
+
+    // Don't leave the sweeper running detached past the server: let a sweep
+    // in progress finish its sends, and only abort one that overruns. A send
+    // interrupted that way keeps its claim until a later sweep, in this or
+    // any other process, releases it as orphaned after ORPHANED_CLAIM_AGE.
+    let _ = stop_sweeper.send(true);
+    let drained = tokio::time::timeout(SWEEPER_DRAIN_TIMEOUT, &mut sweeper).await;
+    if drained.is_err() {
+        tracing::warn!("background sweep overran {SWEEPER_DRAIN_TIMEOUT:?} on shutdown, aborting");
+        sweeper.abort();
+    }
+    served
+}
+
+/// Resolves on Ctrl-C so the server can shut down gracefully.
+async fn shutdown_signal() {
+    if let Err(e) = tokio::signal::ctrl_c().await {
+        tracing::warn!("failed to listen for Ctrl-C: {e}");
+        std::future::pending::<()>().await;
+    }
+    info!("shutting down dashboard");
+}
+
+// ── Background sweep scheduling ──────────────────────────────────────
+
+/// Longest the background sweeper sleeps between passes.
+const SWEEP_INTERVAL: Duration = Duration::from_secs(60);
+/// How long shutdown waits for an in-progress sweep to finish.
+const SWEEPER_DRAIN_TIMEOUT: Duration = Duration::from_secs(30);
+/// Age after which a scheduled-send claim is treated as orphaned. Claims are
+/// renewed right before each send and every SMTP operation is bounded by the
+/// transport timeout, so a live sender never holds one unrenewed this long,
+/// even through a [`SWEEPER_DRAIN_TIMEOUT`] shutdown.
+const ORPHANED_CLAIM_AGE: Duration = Duration::from_secs(10 * 60);
+/// Minimum pause after a failed sweep. Doubles with each consecutive
+/// failure up to [`SWEEP_INTERVAL`] and resets after a clean pass.
+const SWEEP_ERROR_BACKOFF: Duration = Duration::from_secs(1);
+
+/// How long to sleep before the next sweep: until the earliest future snooze
+/// return or scheduled send, capped at [`SWEEP_INTERVAL`].
+async fn next_sweep_delay(state: &AppState) -> Duration {
+    let now = chrono::Local::now().format("%Y-%m-%dT%H:%M:%S").to_string();
+    let (next_send, next_return) = {
+        let db = state.db.lock().await;
+        (
+            db.seconds_until_next_scheduled_send().ok().flatten(),
+            db.seconds_until_next_snooze_return(&now).ok().flatten(),
+        )
+    };
+    let seconds = [next_send, next_return]
+        .into_iter()
+        .flatten()
+        .fold(SWEEP_INTERVAL.as_secs_f64(), f64::min);
+    // Timestamps have second resolution; never spin faster than that.
+    Duration::from_secs_f64(seconds.max(1.0))
+}
+
+/// The background sweeper loop. Runs until `stop` changes; a sweep already
+/// in progress completes first.
+async fn run_background_sweeps(state: AppState, mut stop: watch::Receiver<bool>) {
+    let limits = SendLimits {
+        parallelism: send_parallelism(),
+        max_attempts: max_send_attempts(),
+    };
+    let mut error_backoff = SWEEP_ERROR_BACKOFF;
+    loop {
+        let mut failed = false;
+        if let Err(e) = run_unsnooze_sweep(&state).await {
+            tracing::warn!("unsnooze sweep error: {e}");
+            failed = true;
+        }
+        if let Err(e) = run_scheduled_send_sweep(&state, limits).await {
+            tracing::warn!("scheduled send sweep error: {e}");
+            failed = true;
+        }
+        let mut delay = next_sweep_delay(&state).await;
+        // A failing sweep leaves due work in place, which would otherwise
+        // pull the next pass in to the 1s floor for as long as it fails.
+        if failed {
+            delay = delay.max(error_backoff);
+            error_backoff = (error_backoff * 2).min(SWEEP_INTERVAL);
+        } else {
+            error_backoff = SWEEP_ERROR_BACKOFF;
+        }
+        tokio::select! {
+            _ = tokio::time::sleep(delay) => {}
+            _ = stop.changed() => break,
+        }
+    }
 }
 
 // ── Background unsnooze sweep ────────────────────────────────────────
@@ -188,8 +273,7 @@ async fn run_unsnooze_sweep(state: &AppState) -> anyhow::Result<()> {
         .await
         {
             Ok(()) => {
-                let db = state.db.lock().await;
-                let _ = db.delete_snoozed(&msg.id);
+                let _ = state.db.lock().await.delete_snoozed(&msg.id);
                 info!(
                     "unsnoozed UID {} back to {} ({})",
                     msg.uid, msg.original_folder, msg.account
@@ -211,10 +295,59 @@ async fn run_unsnooze_sweep(state: &AppState) -> anyhow::Result<()> {
 
 // ── Background scheduled send sweep ─────────────────────────────────
 
-async fn run_scheduled_send_sweep(state: &AppState) -> anyhow::Result<()> {
+/// Delay before retrying a failed scheduled send, indexed by consecutive
+/// failures: 30s doubling up to a 10 minute ceiling, which then repeats.
+const SEND_RETRY_BACKOFF_SECS: [u64; 6] = [30, 60, 120, 240, 480, 600];
+
+/// Failed attempts after which a scheduled send is marked `failed` when no
+/// `ENVELOPE_MAX_SEND_ATTEMPTS` is set. With [`SEND_RETRY_BACKOFF_SECS`] the
+/// last two retries wait out the 10 minute ceiling, and the last one lands
+/// 2130s (about 35 minutes) after the first failure.
+const DEFAULT_MAX_SEND_ATTEMPTS: u32 = 8;
+
+/// Scheduled sends in flight at once when no `ENVELOPE_SEND_PARALLELISM` is
+/// set. Each account's SMTP transport pools up to 10 connections, so this
+/// stays well inside a single account's pool.
+const DEFAULT_SEND_PARALLELISM: usize = 4;
+
+/// How many scheduled sends the sweep runs concurrently.
+fn send_parallelism() -> usize {
+    std::env::var("ENVELOPE_SEND_PARALLELISM")
+        .ok()
+        .and_then(|v| v.parse().ok())
+        .filter(|&n| n > 0)
+        .unwrap_or(DEFAULT_SEND_PARALLELISM)
+}
+
+/// How many failed attempts a scheduled send gets before it is abandoned.
+fn max_send_attempts() -> u32 {
+    std::env::var("ENVELOPE_MAX_SEND_ATTEMPTS")
+        .ok()
+        .and_then(|v| v.parse().ok())
+        .filter(|&n| n > 0)
+        .unwrap_or(DEFAULT_MAX_SEND_ATTEMPTS)
+}
+
+/// Settings the scheduled-send sweep reads from the environment once, when
+/// the sweeper starts.
+#[derive(Clone, Copy)]
+struct SendLimits {
+    parallelism: usize,
+    max_attempts: u32,
+}
+
+async fn run_scheduled_send_sweep(state: &AppState, limits: SendLimits) -> anyhow::Result<()> {
     let due = {
         let db = state.db.lock().await;
-        db.list_drafts_due_for_send()
+        // Scheduled sends claimed by a process that died mid-send. Checked on
+        // every pass, not just at startup, so another dashboard's crash is
+        // picked up without restarting this one.
+        match db.recover_orphaned_sends(ORPHANED_CLAIM_AGE.as_secs()) {
+            Ok(0) => {}
+            Ok(n) => info!("released {n} interrupted scheduled send(s)"),
+            Err(e) => tracing::warn!("failed to release interrupted scheduled sends: {e}"),
+        }
+        db.claim_drafts_due_for_send()
             .map_err(|e| anyhow::anyhow!("db error: {e}"))?
     };
 
@@ -224,61 +357,108 @@ async fn run_scheduled_send_sweep(state: &AppState) -> anyhow::Result<()> {
 
     info!("scheduled send sweep: {} draft(s) due", due.len());
 
-    for draft in &due {
-        // Resolve credentials for the draft's account
-        let (client_arc, creds) = match state.get_or_create_imap(&draft.account_id).await {
-            Ok(c) => c,
-            Err(e) => {
-                tracing::warn!(
-                    "scheduled send: failed to get credentials for {}: {e}",
-                    draft.account_id
-                );
-                continue;
-            }
-        };
-        // Drop the IMAP client lock — we only needed creds
-        drop(client_arc);
-
-        // Send via SMTP
-        let subject = draft.subject.as_deref().unwrap_or("");
-        match envelope_email_transport::SmtpSender::send_simple(
-            &creds,
-            &draft.to_addr,
-            subject,
-            draft.text_content.as_deref(),
-            draft.html_content.as_deref(),
-            draft.cc_addr.as_deref(),
-            draft.bcc_addr.as_deref(),
-            draft.reply_to.as_deref(),
-        )
-        .await
-        {
-            Ok(message_id) => {
-                let db = state.db.lock().await;
-                let _ = db.mark_draft_sent(&draft.id, Some(&message_id));
-                info!(
-                    "scheduled send: sent draft {} to {} ({})",
-                    draft.id, draft.to_addr, message_id
-                );
-            }
-            Err(e) => {
-                tracing::warn!(
-                    "scheduled send: SMTP failed for draft {} to {}: {e}",
-                    draft.id,
-                    draft.to_addr
-                );
-            }
+    futures_util::stream::iter(&due)
+        .for_each_concurrent(limits.parallelism, |draft| {
+            send_scheduled_draft(state, draft, limits.max_attempts)
+        })
+        .await;
+
+    Ok(())
+}
+
+/// Send one claimed draft and settle its claim either way.
+async fn send_scheduled_draft(state: &AppState, draft: &Draft, max_attempts: u32) {
+    // Only credentials are needed here; don't open an IMAP session for them.
+    let creds = match state.credentials(&draft.account_id).await {
+        Ok(c) => c,
+        Err(e) => {
+            tracing::warn!(
+                "scheduled send: failed to get credentials for {}: {e}",
+                draft.account_id
+            );
+            let _ = state.db.lock().await.release_draft_claim(
+                &draft.id,
+                &SEND_RETRY_BACKOFF_SECS,
+                max_attempts,
+            );
+            return;
+        }
+    };
+
+    // Renew the claim as the send starts; if it was recovered while this
+    // draft sat in the queue, it is no longer ours to send.
+    let renewed = state.db.lock().await.renew_draft_claim(&draft.id);
+    match renewed {
+        Ok(true) => {}
+        Ok(false) => {
+            tracing::warn!(
+                "scheduled send: claim on draft {} was lost, skipping",
+                draft.id
+            );
+            return;
+        }
+        Err(e) => {
+            tracing::warn!(
+                "scheduled send: failed to renew claim on draft {}: {e}",
+                draft.id
+            );
+            return;
         }
     }
 
-    Ok(())
+    // Send via SMTP
+    let subject = draft.subject.as_deref().unwrap_or("");
+    match envelope_email_transport::SmtpSender::send_simple(
+        &creds,
+        &draft.to_addr,
+        subject,
+        draft.text_content.as_deref(),
+        draft.html_content.as_deref(),
+        draft.cc_addr.as_deref(),
+        draft.bcc_addr.as_deref(),
+        draft.reply_to.as_deref(),
+    )
+    .await
+    {
+        Ok(message_id) => {
+            let _ = state
+                .db
+                .lock()
+                .await
+                .mark_draft_sent(&draft.id, Some(&message_id));
+            info!(
+                "scheduled send: sent draft {} to {} ({})",
+                draft.id, draft.to_addr, message_id
+            );
+        }
+        Err(e) if e.is_permanent() => {
+            tracing::warn!(
+                "scheduled send: draft {} to {} rejected, not retrying: {e}",
+                draft.id,
+                draft.to_addr
+            );
+            let _ = state.db.lock().await.fail_draft_claim(&draft.id);
+        }
+        Err(e) => {
+            tracing::warn!(
+                "scheduled send: SMTP failed for draft {} to {}: {e}",
+                draft.id,
+                draft.to_addr
+            );
+            let _ = state.db.lock().await.release_draft_claim(
+                &draft.id,
+                &SEND_RETRY_BACKOFF_SECS,
+                max_attempts,
+            );
+        }
+    }
 }
 
 // ── Static asset serving ─────────────────────────────────────────────
 
 async fn index_page() -> Response {
     match Assets::get_file("index.html") {
-        Some(bytes) => Html(String::from_utf8_lossy(&bytes).to_string()).into_response(),
+        Some(bytes) => Html(bytes).into_response(),
         None => (
             StatusCode::INTERNAL_SERVER_ERROR,
             "index.html missing from embedded assets",
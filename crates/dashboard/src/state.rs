@@ -5,20 +5,50 @@
 //! connection pool so we don't reconnect on every request.
 
 use std::collections::HashMap;
+use std::hash::{DefaultHasher, Hash, Hasher};
 use std::sync::Arc;
+use std::time::{Duration, Instant};
 
 use envelope_email_store::models::AccountWithCredentials;
 use envelope_email_store::{CredentialBackend, Database};
 use tokio::sync::Mutex;
+use tracing::debug;
 
 use envelope_email_transport::ImapClient;
 use envelope_email_transport::imap;
 
+/// Pooled connections idle for longer than this get a `NOOP` before reuse.
+const IMAP_LIVENESS_CHECK_AFTER: Duration = Duration::from_secs(60);
+/// Pooled connections idle for longer than this are dropped outright.
+const IMAP_IDLE_TIMEOUT: Duration = Duration::from_secs(10 * 60);
+/// Upper bound on a pooled connection's age, regardless of activity.
+const IMAP_MAX_LIFETIME: Duration = Duration::from_secs(60 * 60);
+
+/// A cached IMAP connection plus the bookkeeping needed to decide whether it
+/// can still be handed out.
+pub struct PooledImap {
+    client: Arc<Mutex<ImapClient>>,
+    /// Hash of the host/port/username/password the connection logged in with,
+    /// so edited credentials invalidate the cached session.
+    credentials: u64,
+    created_at: Instant,
+    last_used: Instant,
+}
+
+fn credentials_fingerprint(creds: &AccountWithCredentials) -> u64 {
+    let mut hasher = DefaultHasher::new();
+    creds.account.imap_host.hash(&mut hasher);
+    creds.account.imap_port.hash(&mut hasher);
+    creds.effective_imap_username().hash(&mut hasher);
+    creds.effective_imap_password().hash(&mut hasher);
+    hasher.finish()
+}
+
 /// Shared application state injected into every handler.
 #[derive(Clone)]
 pub struct AppState {
     pub db: Arc<Mutex<Database>>,
-    pub imap_pool: Arc<Mutex<HashMap<String, Arc<Mutex<ImapClient>>>>>,
+    pub imap_pool: Arc<Mutex<HashMap<String, PooledImap>>>,
     pub backend: CredentialBackend,
 }
 
@@ -34,28 +64,88 @@ impl AppState {
     /// Resolve credentials for an account and return an Arc-Mutex-wrapped IMAP
     /// client, reusing a pooled connection if one exists.
     ///
-    /// If the pooled connection fails (e.g., the server dropped it), a fresh
-    /// one is created. Callers must hold the returned `Arc<Mutex<ImapClient>>`
-    /// only briefly — serializing access per account is acceptable for a
-    /// localhost single-user dashboard but will bottleneck under concurrent
-    /// requests to the same account.
+    /// A pooled connection is discarded and replaced when the account's
+    /// credentials changed, when it exceeded its maximum lifetime, or when it
+    /// sat idle long enough to warrant a `NOOP` and that `NOOP` failed.
+    /// Connections idle past the idle timeout are pruned on every call. The
+    /// pool lock is only held for bookkeeping, never across a `NOOP` or a
+    /// reconnect.
+    ///
+    /// Callers must hold the returned `Arc<Mutex<ImapClient>>` only briefly —
+    /// serializing access per account is acceptable for a localhost
+    /// single-user dashboard but will bottleneck under concurrent requests to
+    /// the same account.
     pub async fn get_or_create_imap(
         &self,
         account_id: &str,
     ) -> anyhow::Result<(Arc<Mutex<ImapClient>>, AccountWithCredentials)> {
         // Fetch credentials fresh every time (they may have changed).
         let creds = self.resolve_credentials(account_id).await?;
+        let fingerprint = credentials_fingerprint(&creds);
+        let now = Instant::now();
 
-        let mut pool = self.imap_pool.lock().await;
-        if let Some(existing) = pool.get(account_id).cloned() {
-            return Ok((existing, creds));
+        // Decide under the pool lock, but never hold it across network I/O:
+        // a slow NOOP or connect for one account must not stall the others.
+        let candidate = {
+            let mut pool = self.imap_pool.lock().await;
+            pool.retain(|_, pooled| now.duration_since(pooled.last_used) < IMAP_IDLE_TIMEOUT);
+            match pool.get(account_id) {
+                Some(pooled)
+                    if pooled.credentials == fingerprint
+                        && now.duration_since(pooled.created_at) < IMAP_MAX_LIFETIME =>
+                {
+                    let needs_check =
+                        now.duration_since(pooled.last_used) >= IMAP_LIVENESS_CHECK_AFTER;
+                    Some((pooled.client.clone(), needs_check))
+                }
+                Some(_) => {
+                    debug!("discarding pooled IMAP connection for {account_id}");
+                    pool.remove(account_id);
+                    None
+                }
+                None => None,
+            }
+        };
+
+        if let Some((client, needs_check)) = candidate {
+            let alive = !needs_check
+                // A connection another request is holding is in use, hence alive.
+                || match client.try_lock() {
+                    Ok(mut guard) => guard.noop().await.is_ok(),
+                    Err(_) => true,
+                };
+            // Another request may have replaced the entry while we were
+            // checking; only touch it if it is still this connection.
+            let mut pool = self.imap_pool.lock().await;
+            let pooled = pool
+                .get_mut(account_id)
+                .filter(|pooled| Arc::ptr_eq(&pooled.client, &client));
+            if alive {
+                if let Some(pooled) = pooled {
+                    pooled.last_used = Instant::now();
+                }
+                return Ok((client, creds));
+            }
+            debug!("discarding pooled IMAP connection for {account_id}");
+            if pooled.is_some() {
+                pool.remove(account_id);
+            }
         }
 
         let client = imap::connect(&creds)
             .await
             .map_err(|e| anyhow::anyhow!("IMAP connect failed for {account_id}: {e}"))?;
         let arc = Arc::new(Mutex::new(client));
-        pool.insert(account_id.to_string(), arc.clone());
+        let created = Instant::now();
+        self.imap_pool.lock().await.insert(
+            account_id.to_string(),
+            PooledImap {
+                client: arc.clone(),
+                credentials: fingerprint,
+                created_at: created,
+                last_used: created,
+            },
+        );
         Ok((arc, creds))
     }
 
@@ -65,6 +155,12 @@ impl AppState {
         pool.remove(account_id);
     }
 
+    /// Resolve an account's decrypted credentials without touching the IMAP
+    /// pool — for callers that only talk SMTP.
+    pub async fn credentials(&self, account_id: &str) -> anyhow::Result<AccountWithCredentials> {
+        self.resolve_credentials(account_id).await
+    }
+
     async fn resolve_credentials(&self, account_id: &str) -> anyhow::Result<AccountWithCredentials> {
         let passphrase = envelope_email_store::credential_store::get_or_create_passphrase(
             self.backend,
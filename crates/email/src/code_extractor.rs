@@ -7,8 +7,31 @@
 //! patterns. Returns the first code found (4-8 digits), preserving
 //! leading zeros.
 
+use std::sync::LazyLock;
+
 use regex::Regex;
 
+// Patterns are compiled once per process — `extract_code` runs on every
+// new message while `envelope code` polls.
+static EXPLICIT_RE: LazyLock<Regex> = LazyLock::new(|| {
+    Regex::new(
+        r"(?i)(?:verification|confirmation|security|auth(?:entication)?|login)\s*(?:code|number|pin)\s*(?:is|:)?\s*(\d{4,8})"
+    ).unwrap()
+});
+
+static OTP_RE: LazyLock<Regex> = LazyLock::new(|| {
+    Regex::new(
+        r"(?i)(?:one.time|OTP|2FA|two.factor)\s*(?:code|password|passcode|pin)\s*(?:is|:)?\s*(\d{4,8})"
+    ).unwrap()
+});
+
+static HTML_RE: LazyLock<Regex> = LazyLock::new(|| {
+    Regex::new(r"(?i)<(?:strong|b)>(\d{4,8})</(?:strong|b)>|<td[^>]*>(\d{4,8})</td>").unwrap()
+});
+
+static FALLBACK_RE: LazyLock<Regex> =
+    LazyLock::new(|| Regex::new(r"(?m)^\s*(\d{4,8})\s*$").unwrap());
+
 /// Extract a verification code from email text and optional HTML body.
 ///
 /// Checks patterns in priority order:
@@ -20,27 +43,18 @@ use regex::Regex;
 /// Returns the first code found as a String (preserving leading zeros).
 pub fn extract_code(text: &str, html: Option<&str>) -> Option<String> {
     // 1. Explicit label pattern
-    let explicit = Regex::new(
-        r"(?i)(?:verification|confirmation|security|auth(?:entication)?|login)\s*(?:code|number|pin)\s*(?:is|:)?\s*(\d{4,8})"
-    ).unwrap();
-    if let Some(caps) = explicit.captures(text) {
+    if let Some(caps) = EXPLICIT_RE.captures(text) {
         return Some(caps[1].to_string());
     }
 
     // 2. OTP-style pattern
-    let otp = Regex::new(
-        r"(?i)(?:one.time|OTP|2FA|two.factor)\s*(?:code|password|passcode|pin)\s*(?:is|:)?\s*(\d{4,8})"
-    ).unwrap();
-    if let Some(caps) = otp.captures(text) {
+    if let Some(caps) = OTP_RE.captures(text) {
         return Some(caps[1].to_string());
     }
 
     // 3. HTML-prominent: check bold or table-cell codes in HTML
     if let Some(html_body) = html {
-        let html_patterns = Regex::new(
-            r"(?i)<(?:strong|b)>(\d{4,8})</(?:strong|b)>|<td[^>]*>(\d{4,8})</td>"
-        ).unwrap();
-        if let Some(caps) = html_patterns.captures(html_body) {
+        if let Some(caps) = HTML_RE.captures(html_body) {
             // Return whichever group matched (strong/b or td)
             let code = caps.get(1).or_else(|| caps.get(2)).unwrap();
             return Some(code.as_str().to_string());
@@ -48,8 +62,7 @@ pub fn extract_code(text: &str, html: Option<&str>) -> Option<String> {
     }
 
     // 4. Fallback: isolated 4-8 digit number on its own line
-    let fallback = Regex::new(r"(?m)^\s*(\d{4,8})\s*$").unwrap();
-    if let Some(caps) = fallback.captures(text) {
+    if let Some(caps) = FALLBACK_RE.captures(text) {
         return Some(caps[1].to_string());
     }
 
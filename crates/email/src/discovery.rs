@@ -1,7 +1,7 @@
 // Copyright (c) 2026 Tyler Martin
 // Licensed under FSL-1.1-ALv2 (see LICENSE)
 
-use std::collections::HashMap;
+use std::collections::{HashMap, HashSet};
 use std::time::Duration;
 
 use envelope_email_store::models::DiscoveryResult;
@@ -39,10 +39,18 @@ pub struct DiscoveryCandidate {
 /// Tries strategies in priority order: SRV → Autoconfig → MX-derived → common patterns.
 /// Each candidate is probed with a 3-second TCP connect before being accepted.
 pub async fn discover(domain: &str) -> Result<DiscoveryResult, DiscoveryError> {
+    // One resolver for every lookup, so they share its cache and connections.
+    let resolver = TokioAsyncResolver::tokio(ResolverConfig::default(), ResolverOpts::default());
+    // SRV and MX lookups don't depend on each other; wait on them together.
+    let (srv, mx) = tokio::join!(
+        discover_srv(&resolver, domain),
+        discover_mx(&resolver, domain)
+    );
+
     let mut candidates = Vec::new();
 
     // Strategy 0: SRV records
-    match discover_srv(domain).await {
+    match srv {
         Ok(mut c) => candidates.append(&mut c),
         Err(e) => debug!("SRV discovery failed for {domain}: {e}"),
     }
@@ -53,7 +61,7 @@ pub async fn discover(domain: &str) -> Result<DiscoveryResult, DiscoveryError> {
     debug!("autoconfig skipped for {domain} (SRV/MX/common patterns used instead)");
 
     // Strategy 2: MX-derived
-    match discover_mx(domain).await {
+    match mx {
         Ok(mut c) => candidates.append(&mut c),
         Err(e) => debug!("MX discovery failed for {domain}: {e}"),
     }
@@ -67,10 +75,14 @@ pub async fn discover(domain: &str) -> Result<DiscoveryResult, DiscoveryError> {
 
     // Sort by priority (lower = better)
     candidates.sort_by_key(|c| c.priority);
+    dedupe_candidates(&mut candidates);
 
-    // Probe candidates and pick the best reachable SMTP + IMAP
-    let smtp = probe_first(&candidates, "smtp").await;
-    let imap = probe_first(&candidates, "imap").await;
+    // Probe candidates and pick the best reachable SMTP + IMAP. The two
+    // roles are independent, so probe them side by side.
+    let (smtp, imap) = tokio::join!(
+        probe_first(&candidates, "smtp"),
+        probe_first(&candidates, "imap")
+    );
 
     match (smtp, imap) {
         (Some(s), Some(i)) => {
@@ -100,6 +112,14 @@ pub async fn discover(domain: &str) -> Result<DiscoveryResult, DiscoveryError> {
     }
 }
 
+/// Drop repeated endpoints, keeping the first (best-priority) occurrence.
+/// Several MX records for one provider all derive the same hosts, and an
+/// unreachable endpoint would otherwise cost a full probe timeout per copy.
+fn dedupe_candidates(candidates: &mut Vec<DiscoveryCandidate>) {
+    let mut seen = HashSet::new();
+    candidates.retain(|c| seen.insert((c.role.clone(), c.host.clone(), c.port)));
+}
+
 /// Probe candidates of a given role and return the first one that accepts a TCP connection.
 async fn probe_first(candidates: &[DiscoveryCandidate], role: &str) -> Option<DiscoveryCandidate> {
     for c in candidates.iter().filter(|c| c.role == role) {
@@ -131,14 +151,22 @@ async fn probe_tcp(host: &str, port: u16) -> bool {
 }
 
 /// Discover SMTP/IMAP via SRV records.
-async fn discover_srv(domain: &str) -> Result<Vec<DiscoveryCandidate>, DiscoveryError> {
-    let resolver = TokioAsyncResolver::tokio(ResolverConfig::default(), ResolverOpts::default());
-
+async fn discover_srv(
+    resolver: &TokioAsyncResolver,
+    domain: &str,
+) -> Result<Vec<DiscoveryCandidate>, DiscoveryError> {
     let mut candidates = Vec::new();
 
     // _submissions._tcp.{domain} → SMTP submission (port 465)
+    // _imaps._tcp.{domain} → IMAP over TLS (port 993)
     let smtp_srv = format!("_submissions._tcp.{domain}.");
-    match resolver.srv_lookup(&smtp_srv).await {
+    let imap_srv = format!("_imaps._tcp.{domain}.");
+    let (smtp_lookup, imap_lookup) = tokio::join!(
+        resolver.srv_lookup(smtp_srv.as_str()),
+        resolver.srv_lookup(imap_srv.as_str())
+    );
+
+    match smtp_lookup {
         Ok(lookup) => {
             for record in lookup.iter() {
                 let host = record
@@ -158,9 +186,7 @@ async fn discover_srv(domain: &str) -> Result<Vec<DiscoveryCandidate>, Discovery
         Err(e) => debug!("SRV lookup {smtp_srv} failed: {e}"),
     }
 
-    // _imaps._tcp.{domain} → IMAP over TLS (port 993)
-    let imap_srv = format!("_imaps._tcp.{domain}.");
-    match resolver.srv_lookup(&imap_srv).await {
+    match imap_lookup {
         Ok(lookup) => {
             for record in lookup.iter() {
                 let host = record
@@ -184,9 +210,10 @@ async fn discover_srv(domain: &str) -> Result<Vec<DiscoveryCandidate>, Discovery
 }
 
 /// Discover SMTP/IMAP by resolving MX records and deriving hostnames.
-async fn discover_mx(domain: &str) -> Result<Vec<DiscoveryCandidate>, DiscoveryError> {
-    let resolver = TokioAsyncResolver::tokio(ResolverConfig::default(), ResolverOpts::default());
-
+async fn discover_mx(
+    resolver: &TokioAsyncResolver,
+    domain: &str,
+) -> Result<Vec<DiscoveryCandidate>, DiscoveryError> {
     let mx_lookup = resolver
         .mx_lookup(domain)
         .await
@@ -309,6 +336,31 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_dedupe_keeps_first_occurrence() {
+        let candidate = |host: &str, port, role: &str, source: &str| DiscoveryCandidate {
+            host: host.into(),
+            port,
+            role: role.into(),
+            priority: 2,
+            source: source.into(),
+        };
+        let mut candidates = vec![
+            candidate("smtp.gmail.com", 465, "smtp", "mx:a"),
+            candidate("imap.gmail.com", 993, "imap", "mx:a"),
+            candidate("smtp.gmail.com", 465, "smtp", "mx:b"),
+            candidate("smtp.gmail.com", 587, "smtp", "mx:b"),
+            candidate("imap.gmail.com", 993, "imap", "mx:b"),
+        ];
+        dedupe_candidates(&mut candidates);
+        assert_eq!(candidates.len(), 3);
+        assert!(
+            candidates
+                .iter()
+                .all(|c| c.source == "mx:a" || c.port == 587)
+        );
+    }
+
     #[test]
     fn test_common_patterns_generates_both_roles() {
         let candidates = common_pattern_candidates("example.com");
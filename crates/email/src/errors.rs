@@ -31,6 +31,20 @@ pub enum SmtpError {
 
     #[error("SMTP send error: {0}")]
     Send(String),
+
+    #[error("SMTP server rejected the message: {0}")]
+    Rejected(String),
+}
+
+impl SmtpError {
+    /// Whether resending the same message is pointless: the server answered
+    /// with a permanent (5xx) failure or refused our credentials.
+    pub fn is_permanent(&self) -> bool {
+        matches!(
+            self,
+            Self::Auth(_) | Self::RecipientRejected(_) | Self::Rejected(_)
+        )
+    }
 }
 
 #[derive(Debug, Error)]
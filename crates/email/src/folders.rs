@@ -27,7 +27,13 @@ pub async fn detect_and_store_provider(
     account_id: &str,
 ) -> Result<ProviderType, ImapError> {
     let folders = imap::list_folders(client).await?;
-    let provider = provider::detect_provider(&folders);
+    Ok(store_detected_provider(&folders, db, account_id))
+}
+
+/// Detect the provider from an already-fetched folder list, store it, and
+/// cache its canonical folder mappings.
+fn store_detected_provider(folders: &[String], db: &Database, account_id: &str) -> ProviderType {
+    let provider = provider::detect_provider(folders);
 
     info!("detected provider type: {provider} for account {account_id}");
 
@@ -54,7 +60,26 @@ pub async fn detect_and_store_provider(
         }
     }
 
-    Ok(provider)
+    provider
+}
+
+/// The stored provider type for an account, if it has been detected before.
+fn stored_provider(db: &Database, account_id: &str) -> Option<ProviderType> {
+    let stored = db.get_provider_type(account_id).ok()??;
+    let provider = ProviderType::from_str_value(&stored);
+    if provider == ProviderType::Unknown {
+        return None;
+    }
+    debug!("using stored provider type: {provider}");
+    Some(provider)
+}
+
+/// Provider for an account given its folder list, detecting (and storing)
+/// it from `folders` on first use. Saves a second `LIST` compared to
+/// [`get_or_detect_provider`] when the caller needs the folders anyway.
+fn provider_for_folders(folders: &[String], db: &Database, account_id: &str) -> ProviderType {
+    stored_provider(db, account_id)
+        .unwrap_or_else(|| store_detected_provider(folders, db, account_id))
 }
 
 /// Get the provider type for an account, detecting on first use.
@@ -68,12 +93,8 @@ pub async fn get_or_detect_provider(
     account_id: &str,
 ) -> Result<ProviderType, ImapError> {
     // Check stored value first
-    if let Ok(Some(stored)) = db.get_provider_type(account_id) {
-        let provider = ProviderType::from_str_value(&stored);
-        if provider != ProviderType::Unknown {
-            debug!("using stored provider type: {provider}");
-            return Ok(provider);
-        }
+    if let Some(provider) = stored_provider(db, account_id) {
+        return Ok(provider);
     }
 
     // Not stored yet — detect and store
@@ -96,13 +117,15 @@ pub async fn detect_drafts_folder(
         return Ok(Some(cached));
     }
 
+    // A single LIST serves provider detection, verification and fallbacks.
+    let folders = imap::list_folders(client).await?;
+
     // Try provider-aware resolution
-    let provider = get_or_detect_provider(client, db, account_id).await?;
+    let provider = provider_for_folders(&folders, db, account_id);
     if provider != ProviderType::Unknown {
         let resolved = provider::resolve_folder(provider, canonical::DRAFTS).to_string();
 
         // Verify the folder actually exists on the server
-        let folders = imap::list_folders(client).await?;
         if folders.iter().any(|f| f == &resolved) {
             info!("resolved drafts folder via provider ({provider}): {resolved}");
             if let Err(e) = db.set_detected_folder(account_id, "drafts", &resolved) {
@@ -117,7 +140,6 @@ pub async fn detect_drafts_folder(
     }
 
     // Fallback: try all known candidates
-    let folders = imap::list_folders(client).await?;
     let folder_set: std::collections::HashSet<&str> = folders.iter().map(|s| s.as_str()).collect();
 
     for candidate in provider::all_candidates_for(canonical::DRAFTS) {
@@ -162,13 +184,15 @@ pub async fn detect_sent_folder(
         return Ok(Some(cached));
     }
 
+    // A single LIST serves provider detection, verification and fallbacks.
+    let folders = imap::list_folders(client).await?;
+
     // Try provider-aware resolution
-    let provider = get_or_detect_provider(client, db, account_id).await?;
+    let provider = provider_for_folders(&folders, db, account_id);
     if provider != ProviderType::Unknown {
         let resolved = provider::resolve_folder(provider, canonical::SENT).to_string();
 
         // Verify the folder actually exists on the server
-        let folders = imap::list_folders(client).await?;
         if folders.iter().any(|f| f == &resolved) {
             info!("resolved sent folder via provider ({provider}): {resolved}");
             if let Err(e) = db.set_detected_folder(account_id, "sent", &resolved) {
@@ -182,7 +206,6 @@ pub async fn detect_sent_folder(
     }
 
     // Fallback: try all known candidates
-    let folders = imap::list_folders(client).await?;
     let folder_set: std::collections::HashSet<&str> = folders.iter().map(|s| s.as_str()).collect();
 
     for candidate in provider::all_candidates_for(canonical::SENT) {
@@ -231,13 +254,15 @@ pub async fn detect_folder(
         }
     }
 
+    // A single LIST serves provider detection, verification and fallbacks.
+    let folders = imap::list_folders(client).await?;
+
     // Try provider-aware resolution
-    let provider = get_or_detect_provider(client, db, account_id).await?;
+    let provider = provider_for_folders(&folders, db, account_id);
     if provider != ProviderType::Unknown {
         let resolved = provider::resolve_folder(provider, canonical_type).to_string();
 
         // Verify the folder exists
-        let folders = imap::list_folders(client).await?;
         if folders.iter().any(|f| f == &resolved) {
             info!("resolved {canonical_type} folder via provider ({provider}): {resolved}");
             if let Err(e) = db.set_detected_folder(account_id, canonical_type, &resolved) {
@@ -248,7 +273,6 @@ pub async fn detect_folder(
     }
 
     // Fallback: try all known candidates for this type
-    let folders = imap::list_folders(client).await?;
     let folder_set: std::collections::HashSet<&str> = folders.iter().map(|s| s.as_str()).collect();
 
     for candidate in provider::all_candidates_for(canonical_type) {
@@ -273,9 +297,9 @@ pub async fn classify_folders(
     db: &Database,
     account_id: &str,
 ) -> Result<Vec<FolderInfo>, ImapError> {
-    let provider = get_or_detect_provider(client, db, account_id).await?;
     let folders = imap::list_folders(client).await?;
-    let mut results = Vec::new();
+    let provider = provider_for_folders(&folders, db, account_id);
+    let mut results = Vec::with_capacity(folders.len());
 
     for folder in &folders {
         let folder_type = provider::classify_folder(folder)
@@ -373,36 +397,33 @@ mod tests {
     #[test]
     fn test_provider_type_db_roundtrip() {
         let db = Database::open_memory().unwrap();
-        let passphrase = "test";
-
-        // Create a test account
-        let acct = db
-            .create_account(
-                "Test Gmail",
-                "test@gmail.com",
-                "pw",
-                "smtp.gmail.com",
-                587,
-                "imap.gmail.com",
-                993,
-                passphrase,
+
+        // Insert the account row directly: create_account would spend an
+        // Argon2 derivation encrypting a password this test never reads.
+        db.conn()
+            .execute(
+                "INSERT INTO accounts (id, name, username, domain, smtp_host, smtp_port,
+                 imap_host, imap_port, encrypted_password)
+                 VALUES ('acct1', 'Test Gmail', 'test@gmail.com', 'gmail.com',
+                         'smtp.gmail.com', 587, 'imap.gmail.com', 993, 'encrypted')",
+                [],
             )
             .unwrap();
 
         // No provider type initially
-        assert!(db.get_provider_type(&acct.id).unwrap().is_none());
+        assert!(db.get_provider_type("acct1").unwrap().is_none());
 
         // Store provider type
-        db.set_provider_type(&acct.id, "gmail").unwrap();
+        db.set_provider_type("acct1", "gmail").unwrap();
         assert_eq!(
-            db.get_provider_type(&acct.id).unwrap().as_deref(),
+            db.get_provider_type("acct1").unwrap().as_deref(),
             Some("gmail")
         );
 
         // Update provider type
-        db.set_provider_type(&acct.id, "standard").unwrap();
+        db.set_provider_type("acct1", "standard").unwrap();
         assert_eq!(
-            db.get_provider_type(&acct.id).unwrap().as_deref(),
+            db.get_provider_type("acct1").unwrap().as_deref(),
             Some("standard")
         );
     }
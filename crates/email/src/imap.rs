@@ -2,7 +2,8 @@
 // Licensed under FSL-1.1-ALv2 (see LICENSE)
 
 use std::pin::pin;
-use std::sync::Arc;
+use std::sync::{Arc, OnceLock};
+use std::time::Duration;
 
 use async_imap::Session;
 use envelope_email_store::models::{
@@ -11,6 +12,7 @@ use envelope_email_store::models::{
 use futures_util::StreamExt;
 use mail_parser::MimeHeaders;
 use tokio::net::TcpStream;
+use tokio::time::timeout;
 use tokio_rustls::TlsConnector;
 use tokio_rustls::client::TlsStream;
 use tracing::{debug, info, warn};
@@ -35,54 +37,176 @@ fn validate_imap_input(s: &str) -> Result<(), ImapError> {
 pub type ImapSession = Session<TlsStream<TcpStream>>;
 
 /// IMAP client wrapping an authenticated async-imap session.
+///
+/// Tracks the currently selected mailbox so that consecutive operations on
+/// the same folder over a long-lived (pooled) connection skip the redundant
+/// `SELECT` round-trip.
 pub struct ImapClient {
     session: ImapSession,
+    selected: Option<String>,
+    /// Whether the server advertises RFC 6851 `MOVE`; queried lazily once.
+    supports_move: Option<bool>,
 }
 
 impl ImapClient {
+    /// Raw access to the underlying session. Callers may issue their own
+    /// `SELECT`/`EXAMINE`, so the selected-folder cache is dropped.
     pub fn session_mut(&mut self) -> &mut ImapSession {
+        self.selected = None;
         &mut self.session
     }
+
+    /// The folder currently selected on this connection, if known.
+    pub fn selected_folder(&self) -> Option<&str> {
+        self.selected.as_deref()
+    }
+
+    /// `SELECT` a folder unconditionally and return its mailbox status.
+    pub async fn select(
+        &mut self,
+        folder: &str,
+    ) -> Result<async_imap::types::Mailbox, ImapError> {
+        self.selected = None;
+        let mailbox = self
+            .session
+            .select(folder)
+            .await
+            .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+        self.selected = Some(folder.to_string());
+        Ok(mailbox)
+    }
+
+    /// `SELECT` a folder unless it is already the selected one.
+    pub async fn ensure_selected(&mut self, folder: &str) -> Result<(), ImapError> {
+        if self.selected.as_deref() == Some(folder) {
+            return Ok(());
+        }
+        self.select(folder).await.map(|_| ())
+    }
+
+    /// `UID SEARCH` the selected folder. Searching doesn't change the
+    /// selection, so unlike going through [`ImapClient::session_mut`] this
+    /// keeps the selected-folder cache.
+    pub async fn uid_search(
+        &mut self,
+        query: &str,
+    ) -> Result<std::collections::HashSet<u32>, ImapError> {
+        self.session
+            .uid_search(query)
+            .await
+            .map_err(|e| ImapError::Protocol(format!("UID SEARCH {query}: {e}")))
+    }
+
+    /// Whether the server supports `UID MOVE` (RFC 6851). The `CAPABILITY`
+    /// lookup happens once per connection; failures count as unsupported.
+    pub async fn supports_move(&mut self) -> bool {
+        if let Some(supported) = self.supports_move {
+            return supported;
+        }
+        let supported = match self.session.capabilities().await {
+            Ok(caps) => caps.has_str("MOVE"),
+            Err(e) => {
+                debug!("CAPABILITY failed, assuming no MOVE support: {e}");
+                false
+            }
+        };
+        self.supports_move = Some(supported);
+        supported
+    }
+
+    /// Issue a `NOOP` — used as a cheap liveness check for pooled connections.
+    ///
+    /// Bounded by `CONNECT_STAGE_TIMEOUT`: a half-open socket (dropped by a
+    /// NAT or the server) would otherwise hang until TCP gives up, holding
+    /// the caller's lock on this client the whole time. A timeout counts as
+    /// a dead connection.
+    pub async fn noop(&mut self) -> Result<(), ImapError> {
+        timeout(CONNECT_STAGE_TIMEOUT, self.session.noop())
+            .await
+            .map_err(|_| ImapError::Connection("NOOP timed out".to_string()))?
+            .map_err(|e| ImapError::Connection(format!("NOOP failed: {e}")))
+    }
 }
 
-/// Connect to an IMAP server over TLS and authenticate.
-pub async fn connect(account: &AccountWithCredentials) -> Result<ImapClient, ImapError> {
+/// Shared TLS client configuration. Building it parses the whole webpki root
+/// set, so do that once per process rather than once per connection.
+fn tls_connector() -> TlsConnector {
+    static TLS_CONFIG: OnceLock<Arc<rustls::ClientConfig>> = OnceLock::new();
+    let config = TLS_CONFIG.get_or_init(|| {
+        let mut root_store = rustls::RootCertStore::empty();
+        root_store.extend(webpki_roots::TLS_SERVER_ROOTS.iter().cloned());
+        Arc::new(
+            rustls::ClientConfig::builder()
+                .with_root_certificates(root_store)
+                .with_no_client_auth(),
+        )
+    });
+    TlsConnector::from(config.clone())
+}
+
+/// Shared message parser. `MessageParser::default()` fills a header-name
+/// dispatch table on every call; build it once instead of once per message.
+pub(crate) fn message_parser() -> &'static mail_parser::MessageParser {
+    static PARSER: OnceLock<mail_parser::MessageParser> = OnceLock::new();
+    PARSER.get_or_init(mail_parser::MessageParser::default)
+}
+
+/// Upper bound on each stage of establishing a session (TCP connect, TLS
+/// handshake, LOGIN) and on a pooled connection's liveness `NOOP`, so an
+/// unresponsive server fails fast instead of hanging the caller indefinitely.
+const CONNECT_STAGE_TIMEOUT: Duration = Duration::from_secs(10);
+
+/// Connect to an IMAP server over TLS, authenticate, and return the raw
+/// session. Shared by [`connect`] and `idle::connect_session`.
+pub(crate) async fn login_session(
+    account: &AccountWithCredentials,
+) -> Result<ImapSession, ImapError> {
     let host = &account.account.imap_host;
     let port = account.account.imap_port;
     let username = account.effective_imap_username();
     let password = account.effective_imap_password();
 
-    info!("connecting to IMAP {host}:{port} as {username}");
+    let timed_out =
+        |stage: &str| ImapError::Connection(format!("{stage} with {host}:{port} timed out"));
 
-    let tcp = TcpStream::connect((host.as_str(), port))
+    let tcp = timeout(CONNECT_STAGE_TIMEOUT, TcpStream::connect((host.as_str(), port)))
         .await
+        .map_err(|_| timed_out("TCP connect"))?
         .map_err(|e| ImapError::Connection(format!("{host}:{port}: {e}")))?;
 
-    let mut root_store = rustls::RootCertStore::empty();
-    root_store.extend(webpki_roots::TLS_SERVER_ROOTS.iter().cloned());
-    let tls_config = rustls::ClientConfig::builder()
-        .with_root_certificates(root_store)
-        .with_no_client_auth();
-
-    let connector = TlsConnector::from(Arc::new(tls_config));
     let server_name = rustls::pki_types::ServerName::try_from(host.as_str())
         .map_err(|e| ImapError::Connection(format!("invalid server name {host}: {e}")))?
         .to_owned();
 
-    let tls_stream = connector
-        .connect(server_name, tcp)
+    let tls_stream = timeout(CONNECT_STAGE_TIMEOUT, tls_connector().connect(server_name, tcp))
         .await
+        .map_err(|_| timed_out("TLS handshake"))?
         .map_err(|e| ImapError::Connection(format!("TLS handshake with {host}: {e}")))?;
 
     let client = async_imap::Client::new(tls_stream);
 
-    let session = client
-        .login(username, password)
+    timeout(CONNECT_STAGE_TIMEOUT, client.login(username, password))
         .await
-        .map_err(|(e, _)| ImapError::Auth(format!("login failed for {username}@{host}: {e}")))?;
+        .map_err(|_| timed_out("LOGIN"))?
+        .map_err(|(e, _)| ImapError::Auth(format!("login failed for {username}@{host}: {e}")))
+}
+
+/// Connect to an IMAP server over TLS and authenticate.
+pub async fn connect(account: &AccountWithCredentials) -> Result<ImapClient, ImapError> {
+    let host = &account.account.imap_host;
+    let port = account.account.imap_port;
+    let username = account.effective_imap_username();
+
+    info!("connecting to IMAP {host}:{port} as {username}");
+
+    let session = login_session(account).await?;
 
     debug!("IMAP session established for {username}@{host}");
-    Ok(ImapClient { session })
+    Ok(ImapClient {
+        session,
+        selected: None,
+        supports_move: None,
+    })
 }
 
 /// List all mailbox folders.
@@ -166,11 +290,7 @@ pub async fn fetch_inbox(
 ) -> Result<Vec<MessageSummary>, ImapError> {
     validate_imap_input(folder)?;
 
-    let mailbox = client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    let mailbox = client.select(folder).await?;
 
     let exists = mailbox.exists;
     if exists == 0 {
@@ -190,55 +310,69 @@ pub async fn fetch_inbox(
         .await
         .map_err(|e| ImapError::Protocol(format!("FETCH {range}: {e}")))?;
 
-    let mut summaries = Vec::new();
+    let mut summaries = Vec::with_capacity((exists - start + 1) as usize);
     let mut stream = messages;
     while let Some(item) = stream.next().await {
-        match item {
-            Ok(fetch) => {
-                let uid = fetch.uid.unwrap_or(0);
-                let flags: Vec<String> = fetch.flags().map(|f| format!("{f:?}")).collect();
-                let size = fetch.size.unwrap_or(0);
-
-                let (from_addr, to_addr, subject, date, message_id) =
-                    if let Some(env) = fetch.envelope() {
-                        let from = imap_envelope_addresses(&env.from);
-                        let to = imap_envelope_addresses(&env.to);
-                        let subj = env
-                            .subject
-                            .as_ref()
-                            .map(|s| decode_rfc2047(s))
-                            .unwrap_or_default();
-                        let dt = env
-                            .date
-                            .as_ref()
-                            .map(|d| String::from_utf8_lossy(d).to_string());
-                        let mid = env
-                            .message_id
-                            .as_ref()
-                            .map(|m| String::from_utf8_lossy(m).to_string());
-                        (from, to, subj, dt, mid)
-                    } else {
-                        (String::new(), String::new(), String::new(), None, None)
-                    };
-
-                summaries.push(MessageSummary {
-                    uid,
-                    message_id,
-                    from_addr,
-                    to_addr,
-                    subject,
-                    date,
-                    flags,
-                    size,
-                });
-            }
-            Err(e) => return Err(ImapError::Protocol(format!("FETCH parse error: {e}"))),
-        }
+        let fetch = item.map_err(|e| ImapError::Protocol(format!("FETCH parse error: {e}")))?;
+        summaries.push(summary_from_fetch(&fetch));
     }
 
     Ok(summaries)
 }
 
+/// Build a [`MessageSummary`] from a `(UID FLAGS ENVELOPE RFC822.SIZE)` fetch.
+fn summary_from_fetch(fetch: &async_imap::types::Fetch) -> MessageSummary {
+    let (from_addr, to_addr, subject, date, message_id) = if let Some(env) = fetch.envelope() {
+        let from = imap_envelope_addresses(&env.from);
+        let to = imap_envelope_addresses(&env.to);
+        let subj = env
+            .subject
+            .as_ref()
+            .map(|s| decode_rfc2047(s))
+            .unwrap_or_default();
+        let dt = env
+            .date
+            .as_ref()
+            .map(|d| String::from_utf8_lossy(d).into_owned());
+        let mid = env
+            .message_id
+            .as_ref()
+            .map(|m| String::from_utf8_lossy(m).into_owned());
+        (from, to, subj, dt, mid)
+    } else {
+        (String::new(), String::new(), String::new(), None, None)
+    };
+
+    MessageSummary {
+        uid: fetch.uid.unwrap_or(0),
+        message_id,
+        from_addr,
+        to_addr,
+        subject,
+        date,
+        flags: fetch.flags().map(|f| flag_name(&f)).collect(),
+        size: fetch.size.unwrap_or(0),
+    }
+}
+
+/// Render a fetched flag the way callers expect (`Seen`, `Flagged`, ...).
+///
+/// Matches the `Debug` output for every variant, but the system flags —
+/// nearly all flags in practice — avoid the formatting machinery.
+fn flag_name(flag: &async_imap::types::Flag<'_>) -> String {
+    use async_imap::types::Flag;
+
+    match flag {
+        Flag::Seen => "Seen".to_string(),
+        Flag::Answered => "Answered".to_string(),
+        Flag::Flagged => "Flagged".to_string(),
+        Flag::Deleted => "Deleted".to_string(),
+        Flag::Draft => "Draft".to_string(),
+        Flag::Recent => "Recent".to_string(),
+        other => format!("{other:?}"),
+    }
+}
+
 /// Decode RFC 2047 encoded words in IMAP ENVELOPE fields.
 ///
 /// IMAP ENVELOPE returns subjects and addresses as raw bytes, which may
@@ -257,12 +391,13 @@ pub async fn fetch_inbox(
 fn decode_rfc2047(raw: &[u8]) -> String {
     let input = String::from_utf8_lossy(raw);
 
-    // Fast path: no encoded words
+    // Fast path: no encoded words (the vast majority of headers). Only one
+    // copy is made, or none if lossy conversion already had to allocate.
     if !input.contains("=?") {
-        return input.to_string();
+        return input.into_owned();
     }
 
-    let mut result = String::new();
+    let mut result = String::with_capacity(input.len());
     let mut remaining = input.as_ref();
 
     while let Some(start) = remaining.find("=?") {
@@ -283,21 +418,20 @@ fn decode_rfc2047(raw: &[u8]) -> String {
             }
 
             // Parse: charset?encoding?text
-            let parts: Vec<&str> = encoded_word.splitn(3, '?').collect();
-            if parts.len() == 3 {
-                let _charset = parts[0]; // TODO: proper charset conversion for non-UTF-8
-                let encoding = parts[1].to_uppercase();
-                let text = parts[2];
-
-                let decoded_bytes = match encoding.as_str() {
-                    "Q" => decode_q_encoding(text),
-                    "B" => {
-                        use base64::Engine;
-                        base64::engine::general_purpose::STANDARD
-                            .decode(text)
-                            .unwrap_or_else(|_| text.as_bytes().to_vec())
-                    }
-                    _ => text.as_bytes().to_vec(),
+            let mut parts = encoded_word.splitn(3, '?');
+            if let (Some(_charset), Some(encoding), Some(text)) =
+                (parts.next(), parts.next(), parts.next())
+            {
+                // TODO: proper charset conversion for non-UTF-8
+                let decoded_bytes = if encoding.eq_ignore_ascii_case("q") {
+                    decode_q_encoding(text)
+                } else if encoding.eq_ignore_ascii_case("b") {
+                    use base64::Engine;
+                    base64::engine::general_purpose::STANDARD
+                        .decode(text)
+                        .unwrap_or_else(|_| text.as_bytes().to_vec())
+                } else {
+                    text.as_bytes().to_vec()
                 };
 
                 result.push_str(&String::from_utf8_lossy(&decoded_bytes));
@@ -377,11 +511,7 @@ pub async fn fetch_message(
 ) -> Result<Option<Message>, ImapError> {
     validate_imap_input(folder)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let uid_range = format!("{uid}");
     let messages = client
@@ -396,12 +526,135 @@ pub async fn fetch_message(
         return Ok(None);
     };
     let fetch = item.map_err(|e| ImapError::Protocol(format!("UID FETCH parse error: {e}")))?;
-    let body: &[u8] = fetch.body().unwrap_or_default();
-    let Some(parsed) = mail_parser::MessageParser::default().parse(body) else {
-        return Ok(None);
-    };
+    Ok(message_from_fetch(&fetch, uid))
+}
+
+/// Messages larger than this (by `RFC822.SIZE`) are fetched by
+/// [`fetch_messages`] as headers plus the first this-many bytes of the body,
+/// so one huge attachment can't balloon a bulk fetch.
+pub const MAX_BULK_MESSAGE_BYTES: u32 = 5 * 1024 * 1024;
+
+/// Fetch several messages by UID with batched `UID FETCH` commands.
+///
+/// Equivalent to calling [`fetch_message`] per UID, but the set goes out as
+/// one command per [`UID_FETCH_BATCH_SIZE`] UIDs instead of one per message. Messages that no
+/// longer exist or fail to parse are simply absent from the result; order
+/// follows the server's response, not `uids`.
+///
+/// Meant for bulk scans (rules, verification codes) that only need headers
+/// and text: messages over [`MAX_BULK_MESSAGE_BYTES`] come back with a
+/// truncated body, and their attachment list may be incomplete.
+pub async fn fetch_messages(
+    client: &mut ImapClient,
+    folder: &str,
+    uids: &[u32],
+) -> Result<Vec<Message>, ImapError> {
+    validate_imap_input(folder)?;
+    if uids.is_empty() {
+        return Ok(Vec::new());
+    }
+
+    client.ensure_selected(folder).await?;
+
+    // Sizes first (a few bytes per message) so oversized ones can be capped.
+    let mut small = Vec::with_capacity(uids.len());
+    let mut large = Vec::new();
+    for uid_set in uid_set_batches(uids) {
+        let mut stream = client
+            .session
+            .uid_fetch(&uid_set, "(UID RFC822.SIZE)")
+            .await
+            .map_err(|e| ImapError::Protocol(format!("UID FETCH {uid_set}: {e}")))?;
+        while let Some(item) = stream.next().await {
+            let fetch =
+                item.map_err(|e| ImapError::Protocol(format!("UID FETCH parse error: {e}")))?;
+            if let Some(uid) = fetch.uid {
+                if fetch.size.unwrap_or(0) > MAX_BULK_MESSAGE_BYTES {
+                    large.push(uid);
+                } else {
+                    small.push(uid);
+                }
+            }
+        }
+    }
+
+    let mut result = Vec::with_capacity(small.len() + large.len());
+    fetch_batches(
+        client,
+        &small,
+        FETCH_MESSAGE_DESCRIPTOR,
+        message_from_fetch,
+        &mut result,
+    )
+    .await?;
+    if !large.is_empty() {
+        debug!("capping {} oversized message(s) in {folder}", large.len());
+        let capped =
+            format!("(UID FLAGS BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.{MAX_BULK_MESSAGE_BYTES}>)");
+        fetch_batches(
+            client,
+            &large,
+            &capped,
+            message_from_capped_fetch,
+            &mut result,
+        )
+        .await?;
+    }
 
-    let flags: Vec<String> = fetch.flags().map(|f| format!("{f:?}")).collect();
+    debug!("fetched {} of {} messages from {folder}", result.len(), uids.len());
+    Ok(result)
+}
+
+/// Run `UID FETCH <descriptor>` over `uids` in batches, parsing each response
+/// with `parse` and appending the results to `out`.
+async fn fetch_batches(
+    client: &mut ImapClient,
+    uids: &[u32],
+    descriptor: &str,
+    parse: fn(&async_imap::types::Fetch, u32) -> Option<Message>,
+    out: &mut Vec<Message>,
+) -> Result<(), ImapError> {
+    for uid_set in uid_set_batches(uids) {
+        let mut stream = client
+            .session
+            .uid_fetch(&uid_set, descriptor)
+            .await
+            .map_err(|e| ImapError::Protocol(format!("UID FETCH {uid_set}: {e}")))?;
+
+        while let Some(item) = stream.next().await {
+            let fetch =
+                item.map_err(|e| ImapError::Protocol(format!("UID FETCH parse error: {e}")))?;
+            if let Some(uid) = fetch.uid
+                && let Some(message) = parse(&fetch, uid)
+            {
+                out.push(message);
+            }
+        }
+    }
+    Ok(())
+}
+
+/// Parse a `FETCH_MESSAGE_DESCRIPTOR` response into a [`Message`].
+fn message_from_fetch(fetch: &async_imap::types::Fetch, uid: u32) -> Option<Message> {
+    message_from_raw(fetch.body().unwrap_or_default(), fetch, uid)
+}
+
+/// Parse a `BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.n>` response into a
+/// [`Message`] by stitching the header and the truncated text back together.
+fn message_from_capped_fetch(fetch: &async_imap::types::Fetch, uid: u32) -> Option<Message> {
+    let header = fetch.header().unwrap_or_default();
+    let text = fetch.text().unwrap_or_default();
+    let mut raw = Vec::with_capacity(header.len() + text.len());
+    raw.extend_from_slice(header);
+    raw.extend_from_slice(text);
+    message_from_raw(&raw, fetch, uid)
+}
+
+/// Parse raw RFC 822 bytes into a [`Message`], taking flags from `fetch`.
+fn message_from_raw(raw: &[u8], fetch: &async_imap::types::Fetch, uid: u32) -> Option<Message> {
+    let parsed = message_parser().parse(raw)?;
+
+    let flags: Vec<String> = fetch.flags().map(|f| flag_name(&f)).collect();
     let from_addr = mp_first_address(parsed.from());
     let to_addr = mp_first_address(parsed.to());
     let cc_addr = {
@@ -435,7 +688,7 @@ pub async fn fetch_message(
         })
         .collect();
 
-    Ok(Some(Message {
+    Some(Message {
         uid,
         message_id,
         from_addr,
@@ -449,7 +702,7 @@ pub async fn fetch_message(
         references,
         flags,
         attachments,
-    }))
+    })
 }
 
 /// Append a message to a folder with the given flags.
@@ -484,11 +737,7 @@ pub async fn find_uid_by_message_id(
     validate_imap_input(folder)?;
     validate_imap_input(message_id)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let search_query = format!("HEADER Message-ID {message_id}");
     let uid_set = client
@@ -512,11 +761,7 @@ pub async fn fetch_list_unsubscribe_headers(
 ) -> Result<(Option<String>, Option<String>), ImapError> {
     validate_imap_input(folder)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let uid_range = format!("{uid}");
     let messages = client
@@ -530,9 +775,9 @@ pub async fn fetch_list_unsubscribe_headers(
         return Ok((None, None));
     };
     let fetch = item.map_err(|e| ImapError::Protocol(format!("UID FETCH parse error: {e}")))?;
-    let header_bytes = fetch.body().unwrap_or_default();
+    let header_bytes = fetch.header().unwrap_or_default();
 
-    let Some(parsed) = mail_parser::MessageParser::default().parse(header_bytes) else {
+    let Some(parsed) = message_parser().parse_headers(header_bytes) else {
         return Ok((None, None));
     };
 
@@ -553,6 +798,47 @@ pub async fn fetch_list_unsubscribe_headers(
     Ok((list_unsub, list_unsub_post))
 }
 
+/// Maximum number of UIDs sent in a single `UID FETCH`. Some servers reject
+/// oversized command lines ("maximum request size exceeded"), so larger sets
+/// are split into several commands.
+const UID_FETCH_BATCH_SIZE: usize = 100;
+
+/// Split `uids` into IMAP sequence-set strings of at most
+/// [`UID_FETCH_BATCH_SIZE`] UIDs each, collapsing consecutive runs into
+/// `start:end` ranges (`1,2,3,7` becomes `1:3,7`).
+pub(crate) fn uid_set_batches(uids: &[u32]) -> Vec<String> {
+    let mut sorted = uids.to_vec();
+    sorted.sort_unstable();
+    sorted.dedup();
+    sorted
+        .chunks(UID_FETCH_BATCH_SIZE)
+        .map(|chunk| {
+            let mut parts: Vec<String> = Vec::new();
+            let mut run_start = chunk[0];
+            let mut run_end = chunk[0];
+            for &uid in &chunk[1..] {
+                if uid == run_end + 1 {
+                    run_end = uid;
+                    continue;
+                }
+                parts.push(uid_range(run_start, run_end));
+                run_start = uid;
+                run_end = uid;
+            }
+            parts.push(uid_range(run_start, run_end));
+            parts.join(",")
+        })
+        .collect()
+}
+
+fn uid_range(start: u32, end: u32) -> String {
+    if start == end {
+        start.to_string()
+    } else {
+        format!("{start}:{end}")
+    }
+}
+
 /// Map human-readable flag names to IMAP flag format.
 fn map_flag_name(flag: &str) -> String {
     match flag.to_lowercase().as_str() {
@@ -576,11 +862,7 @@ pub async fn search(
     validate_imap_input(folder)?;
     validate_imap_input(query)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let uid_set = client
         .session
@@ -599,68 +881,29 @@ pub async fn search(
         return Ok(Vec::new());
     }
 
-    let uid_range = uids
-        .iter()
-        .map(|u| u.to_string())
-        .collect::<Vec<_>>()
-        .join(",");
-
-    let messages = client
-        .session
-        .uid_fetch(&uid_range, "(UID FLAGS ENVELOPE RFC822.SIZE)")
-        .await
-        .map_err(|e| ImapError::Protocol(format!("UID FETCH {uid_range}: {e}")))?;
+    let mut summaries = Vec::with_capacity(uids.len());
+    for uid_range in uid_set_batches(&uids) {
+        let mut msg_stream = client
+            .session
+            .uid_fetch(&uid_range, "(UID FLAGS ENVELOPE RFC822.SIZE)")
+            .await
+            .map_err(|e| ImapError::Protocol(format!("UID FETCH {uid_range}: {e}")))?;
 
-    let mut summaries = Vec::new();
-    let mut msg_stream = messages;
-    while let Some(item) = msg_stream.next().await {
-        match item {
-            Ok(fetch) => {
-                let uid = fetch.uid.unwrap_or(0);
-                let flags: Vec<String> = fetch.flags().map(|f| format!("{f:?}")).collect();
-                let size = fetch.size.unwrap_or(0);
-
-                let (from_addr, to_addr, subject, date, message_id) =
-                    if let Some(env) = fetch.envelope() {
-                        let from = imap_envelope_addresses(&env.from);
-                        let to = imap_envelope_addresses(&env.to);
-                        let subj = env
-                            .subject
-                            .as_ref()
-                            .map(|s| decode_rfc2047(s))
-                            .unwrap_or_default();
-                        let dt = env
-                            .date
-                            .as_ref()
-                            .map(|d| String::from_utf8_lossy(d).to_string());
-                        let mid = env
-                            .message_id
-                            .as_ref()
-                            .map(|m| String::from_utf8_lossy(m).to_string());
-                        (from, to, subj, dt, mid)
-                    } else {
-                        (String::new(), String::new(), String::new(), None, None)
-                    };
-
-                summaries.push(MessageSummary {
-                    uid,
-                    message_id,
-                    from_addr,
-                    to_addr,
-                    subject,
-                    date,
-                    flags,
-                    size,
-                });
-            }
-            Err(e) => return Err(ImapError::Protocol(format!("UID FETCH parse error: {e}"))),
+        while let Some(item) = msg_stream.next().await {
+            let fetch =
+                item.map_err(|e| ImapError::Protocol(format!("UID FETCH parse error: {e}")))?;
+            summaries.push(summary_from_fetch(&fetch));
         }
     }
 
     Ok(summaries)
 }
 
-/// Move a message from one folder to another by UID (copy + delete).
+/// Move a message from one folder to another by UID.
+///
+/// Uses a single `UID MOVE` when the server supports it; otherwise falls
+/// back to `UID COPY` + `\Deleted` + `EXPUNGE` (three round-trips, and the
+/// expunge also removes any other `\Deleted` messages in the folder).
 pub async fn move_message(
     client: &mut ImapClient,
     uid: u32,
@@ -670,14 +913,20 @@ pub async fn move_message(
     validate_imap_input(from)?;
     validate_imap_input(to)?;
 
-    client
-        .session
-        .select(from)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {from}: {e}")))?;
+    client.ensure_selected(from).await?;
 
     let uid_str = uid.to_string();
 
+    if client.supports_move().await {
+        client
+            .session
+            .uid_mv(&uid_str, to)
+            .await
+            .map_err(|e| ImapError::Protocol(format!("UID MOVE {uid} to {to}: {e}")))?;
+        debug!("moved UID {uid} from {from} to {to}");
+        return Ok(());
+    }
+
     client
         .session
         .uid_copy(&uid_str, to)
@@ -721,11 +970,7 @@ pub async fn copy_message(
     validate_imap_input(from)?;
     validate_imap_input(to)?;
 
-    client
-        .session
-        .select(from)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {from}: {e}")))?;
+    client.ensure_selected(from).await?;
 
     client
         .session
@@ -745,11 +990,7 @@ pub async fn delete_message(
 ) -> Result<(), ImapError> {
     validate_imap_input(folder)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let uid_str = uid.to_string();
 
@@ -787,11 +1028,7 @@ pub async fn set_flag(
 ) -> Result<(), ImapError> {
     validate_imap_input(folder)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let imap_flag = map_flag_name(flag);
     validate_imap_input(&imap_flag)?;
@@ -861,11 +1098,7 @@ pub async fn remove_flag(
 ) -> Result<(), ImapError> {
     validate_imap_input(folder)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let imap_flag = map_flag_name(flag);
     validate_imap_input(&imap_flag)?;
@@ -893,11 +1126,7 @@ pub async fn download_attachment(
 ) -> Result<(String, Vec<u8>), ImapError> {
     validate_imap_input(folder)?;
 
-    client
-        .session
-        .select(folder)
-        .await
-        .map_err(|e| ImapError::Protocol(format!("SELECT {folder}: {e}")))?;
+    client.ensure_selected(folder).await?;
 
     let uid_range = format!("{uid}");
     let messages = client
@@ -912,19 +1141,18 @@ pub async fn download_attachment(
     };
     let fetch = item.map_err(|e| ImapError::Protocol(format!("UID FETCH parse error: {e}")))?;
     let body: &[u8] = fetch.body().unwrap_or_default();
-    let parsed = mail_parser::MessageParser::default()
+    let parsed = message_parser()
         .parse(body)
         .ok_or_else(|| ImapError::Protocol(format!("failed to parse message UID {uid}")))?;
 
-    for attachment in parsed.attachments() {
-        let att_name = attachment.attachment_name().unwrap_or("unnamed").to_string();
-        if att_name == filename {
-            return Ok((att_name, attachment.contents().to_vec()));
-        }
-    }
-    Err(ImapError::Protocol(format!(
-        "attachment '{filename}' not found in UID {uid}"
-    )))
+    // Compare borrowed names; only the matching attachment's bytes are copied.
+    parsed
+        .attachments()
+        .find(|attachment| attachment.attachment_name().unwrap_or("unnamed") == filename)
+        .map(|attachment| (filename.to_string(), attachment.contents().to_vec()))
+        .ok_or_else(|| {
+            ImapError::Protocol(format!("attachment '{filename}' not found in UID {uid}"))
+        })
 }
 
 /// Extract first email address from a mail-parser Address.
@@ -950,27 +1178,24 @@ fn mp_first_address(header: Option<&mail_parser::Address<'_>>) -> String {
 /// Format IMAP envelope addresses into a comma-separated string.
 fn imap_envelope_addresses(addrs: &Option<Vec<imap_proto::types::Address<'_>>>) -> String {
     match addrs {
-        Some(list) => list
-            .iter()
-            .map(|a| {
-                let mailbox = a
-                    .mailbox
-                    .as_ref()
-                    .map(|m| String::from_utf8_lossy(m).to_string())
-                    .unwrap_or_default();
-                let host = a
-                    .host
-                    .as_ref()
-                    .map(|h| String::from_utf8_lossy(h).to_string())
-                    .unwrap_or_default();
-                if host.is_empty() {
-                    mailbox
-                } else {
-                    format!("{mailbox}@{host}")
+        Some(list) => {
+            // Build the joined string in place rather than allocating a
+            // String per mailbox/host plus an intermediate Vec.
+            let mut out = String::new();
+            for (i, a) in list.iter().enumerate() {
+                if i > 0 {
+                    out.push_str(", ");
                 }
-            })
-            .collect::<Vec<_>>()
-            .join(", "),
+                if let Some(mailbox) = &a.mailbox {
+                    out.push_str(&String::from_utf8_lossy(mailbox));
+                }
+                if let Some(host) = a.host.as_ref().filter(|h| !h.is_empty()) {
+                    out.push('@');
+                    out.push_str(&String::from_utf8_lossy(host));
+                }
+            }
+            out
+        }
         None => String::new(),
     }
 }
@@ -1011,6 +1236,40 @@ mod tests {
         assert_eq!(map_flag_name("flagged"), "\\Flagged");
     }
 
+    #[test]
+    fn test_flag_name_matches_debug_output() {
+        use async_imap::types::Flag;
+
+        for flag in [
+            Flag::Seen,
+            Flag::Answered,
+            Flag::Flagged,
+            Flag::Deleted,
+            Flag::Draft,
+            Flag::Recent,
+            Flag::MayCreate,
+            Flag::Custom("$Junk".into()),
+        ] {
+            assert_eq!(flag_name(&flag), format!("{flag:?}"));
+        }
+    }
+
+    #[test]
+    fn test_uid_set_batches_collapses_runs() {
+        assert_eq!(uid_set_batches(&[7, 3, 1, 2, 3, 9, 10]), vec!["1:3,7,9:10"]);
+        assert_eq!(uid_set_batches(&[42]), vec!["42"]);
+        assert!(uid_set_batches(&[]).is_empty());
+    }
+
+    #[test]
+    fn test_uid_set_batches_splits_large_sets() {
+        let uids: Vec<u32> = (1..=250).map(|u| u * 2).collect();
+        let batches = uid_set_batches(&uids);
+        assert_eq!(batches.len(), 3);
+        assert_eq!(batches[0].split(',').count(), UID_FETCH_BATCH_SIZE);
+        assert!(batches[2].ends_with(",500"));
+    }
+
     #[test]
     fn test_decode_rfc2047_plain_text() {
         assert_eq!(decode_rfc2047(b"Hello World"), "Hello World");
@@ -1045,6 +1304,17 @@ mod tests {
         assert!(result.contains("World"));
     }
 
+    #[test]
+    fn test_decode_rfc2047_encoding_case_insensitive() {
+        assert_eq!(decode_rfc2047(b"=?UTF-8?Q?caf=C3=A9?="), "caf\u{00e9}");
+        assert_eq!(decode_rfc2047(b"=?UTF-8?B?SGVsbG8=?="), "Hello");
+    }
+
+    #[test]
+    fn test_decode_rfc2047_malformed_word_passes_through() {
+        assert_eq!(decode_rfc2047(b"=?broken?= ok"), "=?broken?= ok");
+    }
+
     #[test]
     fn test_decode_q_encoding_underscore_to_space() {
         let decoded = decode_q_encoding("Hello_World");
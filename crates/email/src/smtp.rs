@@ -1,9 +1,14 @@
 // Copyright (c) 2026 Tyler Martin
 // Licensed under FSL-1.1-ALv2 (see LICENSE)
 
-use envelope_email_store::models::AccountWithCredentials;
+use std::collections::HashMap;
+use std::hash::{DefaultHasher, Hash, Hasher};
+use std::sync::{LazyLock, Mutex};
+use std::time::Duration;
+
+use envelope_email_store::models::{AccountWithCredentials, SmtpTlsMode};
 use lettre::message::header::ContentType;
-use lettre::message::{Attachment as LettreAttachment, MultiPart, SinglePart};
+use lettre::message::{Attachment as LettreAttachment, Mailbox, MultiPart, SinglePart};
 use lettre::transport::smtp::authentication::Credentials;
 use lettre::{AsyncSmtpTransport, AsyncTransport, Message, Tokio1Executor};
 use tracing::info;
@@ -21,10 +26,24 @@ pub struct Attachment {
     pub data: Vec<u8>,
 }
 
-/// SMTP sender — stateless, builds a transport per send.
+/// Per-operation SMTP timeout (connect, and each command/response).
+/// Tighter than lettre's 60s default so a stalled server fails fast.
+const SMTP_TIMEOUT: Duration = Duration::from_secs(20);
+
+/// SMTP sender. Transports are cached per account and pool their
+/// connections; see [`pooled_transport`].
 pub struct SmtpSender;
 
 impl SmtpSender {
+    /// Drop the cached transport (and its pooled connections and
+    /// credentials) for an account, e.g. after the account is deleted.
+    pub fn forget_account(account_id: &str) {
+        TRANSPORTS
+            .lock()
+            .unwrap_or_else(|e| e.into_inner())
+            .remove(account_id);
+    }
+
     /// Send an email through the account's SMTP server — simple path.
     ///
     /// Calls into [`SmtpSender::send`] with no `in_reply_to`, `references`,
@@ -78,21 +97,16 @@ impl SmtpSender {
         references: Option<&[String]>,
         attachments: &[Attachment],
     ) -> Result<String, SmtpError> {
-        let from_addr = if let Some(f) = from_override {
-            f.to_string()
-        } else if let Some(ref display) = account.account.display_name {
-            format!("{display} <{}>", account.account.username)
-        } else {
-            account.account.username.clone()
+        let from = match from_override {
+            Some(f) => f
+                .parse()
+                .map_err(|e| SmtpError::Send(format!("invalid from address: {e}")))?,
+            None => account_mailbox(account)?,
         };
 
         // Build the message headers
         let mut builder = Message::builder()
-            .from(
-                from_addr
-                    .parse()
-                    .map_err(|e| SmtpError::Send(format!("invalid from address: {e}")))?,
-            )
+            .from(from)
             .to(to
                 .parse()
                 .map_err(|e| SmtpError::Send(format!("invalid to address: {e}")))?)
@@ -182,32 +196,9 @@ impl SmtpSender {
             .map(|v| v.to_string())
             .unwrap_or_default();
 
-        // Build SMTP transport
         let smtp_host = &account.account.smtp_host;
         let smtp_port = account.account.smtp_port;
-        let username = account.effective_smtp_username().to_string();
-        let password = account.effective_smtp_password().to_string();
-
-        let creds = Credentials::new(username, password);
-
-        let transport = match smtp_port {
-            465 => {
-                // Implicit TLS (SMTPS)
-                AsyncSmtpTransport::<Tokio1Executor>::relay(smtp_host)
-                    .map_err(|e| SmtpError::Connection(format!("{smtp_host}:{smtp_port}: {e}")))?
-                    .port(smtp_port)
-                    .credentials(creds)
-                    .build()
-            }
-            _ => {
-                // STARTTLS (typically port 587)
-                AsyncSmtpTransport::<Tokio1Executor>::starttls_relay(smtp_host)
-                    .map_err(|e| SmtpError::Connection(format!("{smtp_host}:{smtp_port}: {e}")))?
-                    .port(smtp_port)
-                    .credentials(creds)
-                    .build()
-            }
-        };
+        let transport = pooled_transport(account)?;
 
         info!(
             "sending email via {smtp_host}:{smtp_port} to {to} ({} attachment{})",
@@ -217,10 +208,15 @@ impl SmtpSender {
 
         transport.send(email).await.map_err(|e| {
             let msg = e.to_string();
-            if msg.contains("authentication") || msg.contains("AUTH") {
+            if e.is_transient() {
+                // 4xx: worth retrying whatever the text says.
+                SmtpError::Send(msg)
+            } else if msg.contains("authentication") || msg.contains("AUTH") {
                 SmtpError::Auth(msg)
             } else if msg.contains("rejected") || msg.contains("Recipient") {
                 SmtpError::RecipientRejected(msg)
+            } else if e.is_permanent() {
+                SmtpError::Rejected(msg)
             } else {
                 SmtpError::Send(msg)
             }
@@ -231,6 +227,90 @@ impl SmtpSender {
     }
 }
 
+/// The account's own `From` mailbox. Built from its parts rather than
+/// formatting `"Name <addr>"` and parsing it back, so the display name is
+/// never re-tokenized (quotes, commas and non-ASCII survive as-is) and only
+/// the address itself is validated.
+fn account_mailbox(account: &AccountWithCredentials) -> Result<Mailbox, SmtpError> {
+    let address = account
+        .account
+        .username
+        .parse()
+        .map_err(|e| SmtpError::Send(format!("invalid from address: {e}")))?;
+    Ok(Mailbox::new(account.account.display_name.clone(), address))
+}
+
+/// A cached SMTP transport plus the fingerprint of the settings it was
+/// built with, so edited credentials or server settings replace it.
+struct PooledSmtp {
+    transport: AsyncSmtpTransport<Tokio1Executor>,
+    fingerprint: u64,
+}
+
+/// SMTP transports keyed by account id, at most one per account. Each
+/// transport owns a lettre connection pool, so repeated sends from one
+/// account reuse an authenticated session instead of paying
+/// TCP + TLS + EHLO + AUTH each time.
+///
+/// Pooled connections belong to the runtime that opened them; every binary in
+/// this workspace drives a single tokio runtime per process.
+static TRANSPORTS: LazyLock<Mutex<HashMap<String, PooledSmtp>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// Identify a transport by everything that shapes its connections, so edited
+/// credentials or server settings get a fresh pool.
+fn transport_key(host: &str, port: u16, mode: SmtpTlsMode, username: &str, password: &str) -> u64 {
+    let mut hasher = DefaultHasher::new();
+    host.hash(&mut hasher);
+    port.hash(&mut hasher);
+    std::mem::discriminant(&mode).hash(&mut hasher);
+    username.hash(&mut hasher);
+    password.hash(&mut hasher);
+    hasher.finish()
+}
+
+/// Return the cached transport for this account, building it on first use
+/// and replacing it (dropping the old pool) when its settings changed.
+fn pooled_transport(
+    account: &AccountWithCredentials,
+) -> Result<AsyncSmtpTransport<Tokio1Executor>, SmtpError> {
+    let smtp_host = &account.account.smtp_host;
+    let smtp_port = account.account.smtp_port;
+    let tls_mode = account.account.smtp_tls_mode;
+    let username = account.effective_smtp_username();
+    let password = account.effective_smtp_password();
+    let fingerprint = transport_key(smtp_host, smtp_port, tls_mode, username, password);
+
+    let mut transports = TRANSPORTS.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some(pooled) = transports.get(&account.account.id)
+        && pooled.fingerprint == fingerprint
+    {
+        return Ok(pooled.transport.clone());
+    }
+
+    let builder = match tls_mode {
+        // Implicit TLS (SMTPS, typically port 465)
+        SmtpTlsMode::Tls => AsyncSmtpTransport::<Tokio1Executor>::relay(smtp_host),
+        // STARTTLS (typically port 587)
+        SmtpTlsMode::StartTls => AsyncSmtpTransport::<Tokio1Executor>::starttls_relay(smtp_host),
+    }
+    .map_err(|e| SmtpError::Connection(format!("{smtp_host}:{smtp_port}: {e}")))?;
+
+    let transport = builder
+        .port(smtp_port)
+        .credentials(Credentials::new(username.to_string(), password.to_string()))
+        .timeout(Some(SMTP_TIMEOUT))
+        .build();
+    transports.insert(
+        account.account.id.clone(),
+        PooledSmtp {
+            transport: transport.clone(),
+            fingerprint,
+        },
+    );
+    Ok(transport)
+}
+
 enum BodyPart {
     Single(SinglePart),
     Multi(MultiPart),
@@ -288,6 +368,17 @@ mod tests {
         assert_eq!(att.data.len(), 11);
     }
 
+    #[test]
+    fn transport_key_tracks_connection_settings() {
+        let key =
+            |port, mode, password| transport_key("smtp.example.com", port, mode, "me", password);
+        let base = key(587, SmtpTlsMode::StartTls, "pw");
+        assert_eq!(base, key(587, SmtpTlsMode::StartTls, "pw"));
+        assert_ne!(base, key(465, SmtpTlsMode::StartTls, "pw"));
+        assert_ne!(base, key(587, SmtpTlsMode::Tls, "pw"));
+        assert_ne!(base, key(587, SmtpTlsMode::StartTls, "new"));
+    }
+
     #[test]
     fn unknown_content_type_falls_back_to_octet_stream() {
         let result: ContentType = "not/a valid mime type!!"
@@ -7,6 +7,8 @@
 //! (Message-ID, In-Reply-To, References) with a subject-normalization
 //! fallback for messages missing threading headers.
 
+use std::collections::HashSet;
+
 use envelope_email_store::Database;
 use envelope_email_store::models::AccountWithCredentials;
 use tracing::{debug, info, warn};
@@ -96,23 +98,28 @@ pub fn strip_reply_prefixes(subject: &str) -> String {
 /// References is typically space-separated angle-bracketed IDs:
 /// `<id1@host> <id2@host> <id3@host>`
 pub fn parse_references(refs: &str) -> Vec<String> {
-    refs.split_whitespace()
-        .map(|s| s.trim().to_string())
-        .filter(|s| !s.is_empty())
-        .collect()
+    // split_whitespace never yields empty or padded pieces.
+    refs.split_whitespace().map(str::to_string).collect()
 }
 
 /// Extract a snippet (first ~200 chars) from message body text.
 pub fn extract_snippet(text: &str, max_len: usize) -> String {
-    // Remove quoted lines (starting with >)
-    let cleaned: String = text
+    // Drop quoted lines (starting with >) and collapse whitespace in one
+    // pass, stopping as soon as the snippet is known to need truncation.
+    let mut collapsed = String::with_capacity(text.len().min(max_len.saturating_add(1)));
+    let words = text
         .lines()
         .filter(|line| !line.trim_start().starts_with('>'))
-        .collect::<Vec<_>>()
-        .join(" ");
-
-    // Collapse whitespace
-    let collapsed: String = cleaned.split_whitespace().collect::<Vec<_>>().join(" ");
+        .flat_map(str::split_whitespace);
+    for word in words {
+        if !collapsed.is_empty() {
+            collapsed.push(' ');
+        }
+        collapsed.push_str(word);
+        if collapsed.len() > max_len {
+            break;
+        }
+    }
 
     if collapsed.len() <= max_len {
         collapsed
@@ -123,7 +130,9 @@ pub fn extract_snippet(text: &str, max_len: usize) -> String {
         while end > 0 && !collapsed.is_char_boundary(end) {
             end -= 1;
         }
-        format!("{}...", &collapsed[..end])
+        collapsed.truncate(end);
+        collapsed.push_str("...");
+        collapsed
     }
 }
 
@@ -195,6 +204,11 @@ pub async fn build_threads(
     })
 }
 
+/// Fetch descriptor for the threading scan: the full header plus the first
+/// 32 KiB of the body text, enough for a snippet without downloading
+/// attachments.
+const THREAD_SCAN_DESCRIPTOR: &str = "(UID FLAGS BODY.PEEK[HEADER] BODY.PEEK[TEXT]<0.32768>)";
+
 /// Scan a single folder for threading data.
 async fn scan_folder_for_threads(
     client: &mut imap::ImapClient,
@@ -260,25 +274,24 @@ async fn scan_folder_for_threads(
         format!("{start}:{exists}")
     };
 
-    // Fetch envelope + body for threading headers and snippets
-    // Use BODY.PEEK[] to get full RFC822 for mail-parser, which gives us
-    // Message-ID, In-Reply-To, References, plus body for snippet extraction
+    // Threading only needs headers and snippets only need the start of the
+    // body, so one pass fetches the header plus a capped slice of the text.
     let fetch_items = if last_uid.is_some() {
         // UID-based fetch for incremental
         let messages = client
             .session_mut()
-            .uid_fetch(&fetch_query, "(UID FLAGS BODY.PEEK[])")
+            .uid_fetch(&fetch_query, THREAD_SCAN_DESCRIPTOR)
             .await
             .map_err(|e| ImapError::Protocol(format!("UID FETCH {fetch_query}: {e}")))?;
-        process_fetched_messages(messages, db, account_id, account_email, folder).await?
+        process_fetched_messages(messages, db, account_id, account_email, folder).await
     } else {
         // Sequence-number-based fetch for initial scan
         let messages = client
             .session_mut()
-            .fetch(&fetch_query, "(UID FLAGS BODY.PEEK[])")
+            .fetch(&fetch_query, THREAD_SCAN_DESCRIPTOR)
             .await
             .map_err(|e| ImapError::Protocol(format!("FETCH {fetch_query}: {e}")))?;
-        process_fetched_messages(messages, db, account_id, account_email, folder).await?
+        process_fetched_messages(messages, db, account_id, account_email, folder).await
     };
 
     // Update the last-synced UID to the highest UID we saw
@@ -297,14 +310,30 @@ async fn scan_folder_for_threads(
     Ok(fetch_items)
 }
 
-/// Process fetched IMAP messages and thread them.
+/// Build a snippet from a header plus a possibly truncated body text by
+/// parsing them stitched back together, so MIME structure and transfer
+/// encodings are still honoured.
+fn snippet_from_capped_fetch(header: &[u8], text: &[u8]) -> Option<String> {
+    if text.is_empty() {
+        return None;
+    }
+    let mut raw = Vec::with_capacity(header.len() + text.len());
+    raw.extend_from_slice(header);
+    raw.extend_from_slice(text);
+    imap::message_parser()
+        .parse(&raw)
+        .and_then(|parsed| parsed.body_text(0).map(|t| extract_snippet(&t, 200)))
+}
+
+/// Thread messages fetched with [`THREAD_SCAN_DESCRIPTOR`] as they come off
+/// the stream, skipping (and logging) unparseable items.
 async fn process_fetched_messages<S>(
     messages: S,
     db: &Database,
     account_id: &str,
     account_email: &str,
     folder: &str,
-) -> Result<FolderScanResult, ImapError>
+) -> FolderScanResult
 where
     S: futures_util::Stream<Item = Result<async_imap::types::Fetch, async_imap::error::Error>>
         + Unpin,
@@ -312,147 +341,20 @@ where
     use futures_util::StreamExt;
 
     let mut result = FolderScanResult::default();
-    let mut dirty_threads: std::collections::HashSet<String> = std::collections::HashSet::new();
+    let mut dirty_threads: HashSet<String> = HashSet::new();
     let mut stream = messages;
-
     while let Some(item) = stream.next().await {
         match item {
-            Ok(fetch) => {
-                let uid = match fetch.uid {
-                    Some(u) => u,
-                    None => continue,
-                };
-
-                if uid > result.max_uid {
-                    result.max_uid = uid;
-                }
-
-                let body: &[u8] = fetch.body().unwrap_or_default();
-                let parsed = match mail_parser::MessageParser::default().parse(body) {
-                    Some(p) => p,
-                    None => {
-                        debug!("skipping unparseable message UID {uid} in {folder}");
-                        continue;
-                    }
-                };
-
-                // Extract threading headers
-                let message_id = parsed.message_id().map(|s| s.to_string());
-                let in_reply_to = parsed.in_reply_to().as_text().map(|s| s.to_string());
-                let references_raw = parsed.references().as_text().map(|s| s.to_string());
-                let subject = parsed.subject().unwrap_or_default().to_string();
-                let date = parsed
-                    .date()
-                    .map(|d| d.to_rfc3339())
-                    .unwrap_or_else(|| chrono::Utc::now().to_rfc3339());
-
-                // From/To
-                let from_addr = mp_first_address(parsed.from());
-                let to_addr = mp_all_addresses(parsed.to());
-
-                // Is this outbound? (sent from our account)
-                let is_outbound = from_addr.to_lowercase() == account_email.to_lowercase();
-
-                // Snippet from body
-                let snippet = parsed.body_text(0).map(|t| extract_snippet(&t, 200));
-
-                // ── Threading algorithm ──────────────────────────────
-                // Priority 1: Message-ID / In-Reply-To / References
-                // Priority 2: Subject normalization + address overlap
-
-                let thread_id = None
-                    // Try In-Reply-To
-                    .or_else(|| {
-                        let irt = in_reply_to.as_deref()?;
-                        let first_irt = irt.split_whitespace().next().unwrap_or(irt);
-                        db.find_thread_by_message_id(first_irt, account_id).ok()?
-                    })
-                    // Try References
-                    .or_else(|| {
-                        let refs = references_raw.as_deref()?;
-                        let ref_ids = parse_references(refs);
-                        let ref_strs: Vec<&str> = ref_ids.iter().map(|s| s.as_str()).collect();
-                        db.find_thread_by_references(&ref_strs, account_id).ok()?
-                    })
-                    // Try own Message-ID (maybe we're the original and replies exist)
-                    .or_else(|| {
-                        let mid = message_id.as_deref()?;
-                        db.find_thread_by_message_id(mid, account_id).ok()?
-                    })
-                    // Fallback: subject normalization + address overlap
-                    .or_else(|| {
-                        let normalized = normalize_subject(&subject);
-                        if normalized.is_empty() {
-                            return None;
-                        }
-                        let thread = db.find_thread_by_subject(&normalized, account_id).ok()??;
-                        let thread_msgs = db
-                            .get_thread_messages(&thread.thread_id)
-                            .unwrap_or_default();
-                        let has_overlap = thread_msgs.iter().any(|tm| {
-                            addresses_overlap(
-                                &from_addr,
-                                &to_addr,
-                                tm.from_address.as_deref().unwrap_or(""),
-                                tm.to_addresses.as_deref().unwrap_or(""),
-                            )
-                        });
-                        if has_overlap {
-                            Some(thread.thread_id)
-                        } else {
-                            None
-                        }
-                    });
-
-                // Create a new thread if no match found
-                let tid = match thread_id {
-                    Some(tid) => {
-                        result.threads_updated += 1;
-                        tid
-                    }
-                    None => {
-                        let normalized = normalize_subject(&subject);
-                        match db.create_thread(&normalized, &date, &date, account_id) {
-                            Ok(t) => {
-                                result.threads_created += 1;
-                                t.thread_id
-                            }
-                            Err(e) => {
-                                warn!("failed to create thread for UID {uid}: {e}");
-                                continue;
-                            }
-                        }
-                    }
-                };
-
-                // Upsert the thread message
-                if let Err(e) = db.upsert_thread_message(
-                    &tid,
-                    uid,
-                    message_id.as_deref(),
-                    in_reply_to.as_deref(),
-                    references_raw.as_deref(),
-                    folder,
-                    &from_addr,
-                    &to_addr,
-                    &date,
-                    &subject,
-                    is_outbound,
-                    snippet.as_deref(),
-                ) {
-                    warn!("failed to upsert thread message UID {uid}: {e}");
-                    continue;
-                }
-
-                // Mark thread as dirty — stats will be refreshed in batch after the loop
-                dirty_threads.insert(tid);
-
-                result.messages_indexed += 1;
-            }
-            Err(e) => {
-                warn!("fetch error in {folder}: {e}");
-                continue;
-            }
+            Ok(fetch) => index_fetched_message(
+                &fetch,
+                db,
+                account_id,
+                account_email,
+                folder,
+                &mut result,
+                &mut dirty_threads,
+            ),
+            Err(e) => warn!("fetch error in {folder}: {e}"),
         }
     }
 
@@ -471,27 +373,170 @@ where
         dirty_threads.len()
     );
 
-    Ok(result)
+    result
 }
 
-/// Check if two sets of email addresses overlap (any shared address).
-fn addresses_overlap(from_a: &str, to_a: &str, from_b: &str, to_b: &str) -> bool {
-    let mut set_a: std::collections::HashSet<String> = std::collections::HashSet::new();
-    for addr in std::iter::once(from_a).chain(to_a.split(',')) {
-        let trimmed = addr.trim().to_lowercase();
-        if !trimmed.is_empty() {
-            set_a.insert(trimmed);
-        }
+/// Thread a single fetched message, counting it in `result` and marking its
+/// thread in `dirty_threads` for the stats refresh at the end of the scan.
+fn index_fetched_message(
+    fetch: &async_imap::types::Fetch,
+    db: &Database,
+    account_id: &str,
+    account_email: &str,
+    folder: &str,
+    result: &mut FolderScanResult,
+    dirty_threads: &mut HashSet<String>,
+) {
+    let parser = imap::message_parser();
+
+    let uid = match fetch.uid {
+        Some(u) => u,
+        None => return,
+    };
+
+    if uid > result.max_uid {
+        result.max_uid = uid;
     }
 
-    for addr in std::iter::once(from_b).chain(to_b.split(',')) {
-        let trimmed = addr.trim().to_lowercase();
-        if !trimmed.is_empty() && set_a.contains(&trimmed) {
-            return true;
+    let header: &[u8] = fetch.header().unwrap_or_default();
+    // Header-only parse: skips MIME body/part handling entirely.
+    let parsed = match parser.parse_headers(header) {
+        Some(p) => p,
+        None => {
+            debug!("skipping unparseable message UID {uid} in {folder}");
+            return;
         }
-    }
+    };
+
+    // Extract threading headers
+    let message_id = parsed.message_id().map(|s| s.to_string());
+    let in_reply_to = parsed.in_reply_to().as_text().map(|s| s.to_string());
+    let references_raw = parsed.references().as_text().map(|s| s.to_string());
+    let subject = parsed.subject().unwrap_or_default().to_string();
+    let date = parsed
+        .date()
+        .map(|d| d.to_rfc3339())
+        .unwrap_or_else(|| chrono::Utc::now().to_rfc3339());
+
+    // From/To
+    let from_addr = mp_first_address(parsed.from());
+    let to_addr = mp_all_addresses(parsed.to());
+
+    // Is this outbound? (sent from our account)
+    let is_outbound = from_addr.to_lowercase() == account_email.to_lowercase();
+
+    let snippet = snippet_from_capped_fetch(header, fetch.text().unwrap_or_default());
+
+    // ── Threading algorithm ──────────────────────────────
+    // Priority 1: Message-ID / In-Reply-To / References
+    // Priority 2: Subject normalization + address overlap
+
+    // Message-ID candidates in priority order: In-Reply-To, then
+    // References, then our own Message-ID (maybe we're the original and
+    // replies were indexed first). Resolved in a single query.
+    let ref_ids = references_raw
+        .as_deref()
+        .map(parse_references)
+        .unwrap_or_default();
+    let candidates: Vec<&str> = in_reply_to
+        .as_deref()
+        .map(|irt| irt.split_whitespace().next().unwrap_or(irt))
+        .into_iter()
+        .chain(ref_ids.iter().map(String::as_str))
+        .chain(message_id.as_deref())
+        .collect();
+
+    let thread_id = db
+        .find_thread_by_first_message_id(&candidates, account_id)
+        .ok()
+        .flatten()
+        // Fallback: subject normalization + address overlap
+        .or_else(|| {
+            let normalized = normalize_subject(&subject);
+            if normalized.is_empty() {
+                return None;
+            }
+            let thread = db.find_thread_by_subject(&normalized, account_id).ok()??;
+            let thread_msgs = db
+                .get_thread_messages(&thread.thread_id)
+                .unwrap_or_default();
+            // Build this message's address set once, not once per thread message.
+            let ours = address_set(&from_addr, &to_addr);
+            let has_overlap = thread_msgs.iter().any(|tm| {
+                shares_address(
+                    &ours,
+                    tm.from_address.as_deref().unwrap_or(""),
+                    tm.to_addresses.as_deref().unwrap_or(""),
+                )
+            });
+            if has_overlap {
+                Some(thread.thread_id)
+            } else {
+                None
+            }
+        });
+
+    // Create a new thread if no match found
+    let tid = match thread_id {
+        Some(tid) => {
+            result.threads_updated += 1;
+            tid
+        }
+        None => {
+            let normalized = normalize_subject(&subject);
+            match db.create_thread(&normalized, &date, &date, account_id) {
+                Ok(t) => {
+                    result.threads_created += 1;
+                    t.thread_id
+                }
+                Err(e) => {
+                    warn!("failed to create thread for UID {uid}: {e}");
+                    return;
+                }
+            }
+        }
+    };
 
-    false
+    // Upsert the thread message
+    if let Err(e) = db.upsert_thread_message(
+        &tid,
+        uid,
+        message_id.as_deref(),
+        in_reply_to.as_deref(),
+        references_raw.as_deref(),
+        folder,
+        &from_addr,
+        &to_addr,
+        &date,
+        &subject,
+        is_outbound,
+        snippet.as_deref(),
+    ) {
+        warn!("failed to upsert thread message UID {uid}: {e}");
+        return;
+    }
+
+    // Mark thread as dirty — stats will be refreshed in batch after the loop
+    dirty_threads.insert(tid);
+
+    result.messages_indexed += 1;
+}
+
+/// Lowercased set of the sender and comma-separated recipients.
+fn address_set(from: &str, to: &str) -> HashSet<String> {
+    std::iter::once(from)
+        .chain(to.split(','))
+        .map(|addr| addr.trim().to_lowercase())
+        .filter(|addr| !addr.is_empty())
+        .collect()
+}
+
+/// Check whether any of `from`/`to` appears in `set` (see [`address_set`]).
+fn shares_address(set: &HashSet<String>, from: &str, to: &str) -> bool {
+    std::iter::once(from).chain(to.split(',')).any(|addr| {
+        let trimmed = addr.trim().to_lowercase();
+        !trimmed.is_empty() && set.contains(&trimmed)
+    })
 }
 
 /// Extract first email address from a mail-parser Address.
@@ -599,6 +644,24 @@ mod tests {
         assert!(snippet.contains("Bye!"));
     }
 
+    #[test]
+    fn test_snippet_from_capped_fetch() {
+        let header = b"From: a@example.com\r\nSubject: Hi\r\n\r\n";
+        let snippet = snippet_from_capped_fetch(header, b"Hello there!\r\n").unwrap();
+        assert_eq!(snippet, "Hello there!");
+
+        // A multipart body cut off mid-attachment still yields its text part.
+        let header = b"Subject: Hi\r\nMIME-Version: 1.0\r\n\
+            Content-Type: multipart/mixed; boundary=\"b\"\r\n\r\n";
+        let text = b"--b\r\nContent-Type: text/plain\r\n\r\nSee attached.\r\n\
+            --b\r\nContent-Type: application/pdf\r\n\
+            Content-Transfer-Encoding: base64\r\n\r\nJVBERi0xLjQK";
+        let snippet = snippet_from_capped_fetch(header, text).unwrap();
+        assert_eq!(snippet, "See attached.");
+
+        assert_eq!(snippet_from_capped_fetch(header, b""), None);
+    }
+
     #[test]
     fn test_extract_snippet_truncation() {
         let text = "A".repeat(300);
@@ -607,6 +670,10 @@ mod tests {
         assert!(snippet.ends_with("..."));
     }
 
+    fn addresses_overlap(from_a: &str, to_a: &str, from_b: &str, to_b: &str) -> bool {
+        shares_address(&address_set(from_a, to_a), from_b, to_b)
+    }
+
     #[test]
     fn test_addresses_overlap() {
         assert!(addresses_overlap(
@@ -4,10 +4,15 @@
 use crate::crypto;
 use crate::db::Database;
 use crate::errors::{Result, StoreError};
-use crate::models::{Account, AccountWithCredentials};
+use crate::models::{Account, AccountWithCredentials, SmtpTlsMode};
 use rusqlite::params;
 use uuid::Uuid;
 
+/// The full SELECT column list for accounts (everything except credentials).
+const ACCOUNT_COLS: &str = "id, name, username, domain, smtp_host, smtp_port, imap_host, imap_port, \
+     smtp_username, imap_username, display_name, signature_text, signature_html, created_at, \
+     smtp_tls_mode";
+
 impl Database {
     /// Create a new account with encrypted credentials.
     pub fn create_account(
@@ -24,11 +29,12 @@ impl Database {
         let id = Uuid::new_v4().to_string();
         let domain = username.split('@').nth(1).unwrap_or("unknown").to_string();
         let encrypted_password = crypto::encrypt(password, passphrase)?;
+        let smtp_tls_mode = SmtpTlsMode::from_port(smtp_port);
 
         self.conn().execute(
             "INSERT INTO accounts (id, name, username, domain, smtp_host, smtp_port,
-             imap_host, imap_port, encrypted_password)
-             VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9)",
+             imap_host, imap_port, encrypted_password, smtp_tls_mode)
+             VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10)",
             params![
                 id,
                 name,
@@ -38,7 +44,8 @@ impl Database {
                 smtp_port,
                 imap_host,
                 imap_port,
-                encrypted_password
+                encrypted_password,
+                smtp_tls_mode.as_str()
             ],
         )?;
 
@@ -48,32 +55,11 @@ impl Database {
 
     /// List all accounts (without credentials).
     pub fn list_accounts(&self) -> Result<Vec<Account>> {
-        let mut stmt = self.conn().prepare(
-            "SELECT id, name, username, domain, smtp_host, smtp_port, imap_host, imap_port,
-                    smtp_username, imap_username, display_name, signature_text, signature_html,
-                    created_at
-             FROM accounts ORDER BY created_at",
-        )?;
+        let sql = format!("SELECT {ACCOUNT_COLS} FROM accounts ORDER BY created_at");
+        let mut stmt = self.conn().prepare(&sql)?;
 
         let accounts = stmt
-            .query_map([], |row| {
-                Ok(Account {
-                    id: row.get(0)?,
-                    name: row.get(1)?,
-                    username: row.get(2)?,
-                    domain: row.get(3)?,
-                    smtp_host: row.get(4)?,
-                    smtp_port: row.get(5)?,
-                    imap_host: row.get(6)?,
-                    imap_port: row.get(7)?,
-                    smtp_username: row.get(8)?,
-                    imap_username: row.get(9)?,
-                    display_name: row.get(10)?,
-                    signature_text: row.get(11)?,
-                    signature_html: row.get(12)?,
-                    created_at: row.get(13)?,
-                })
-            })?
+            .query_map([], Self::map_account)?
             .collect::<std::result::Result<Vec<_>, _>>()?;
 
         Ok(accounts)
@@ -81,32 +67,11 @@ impl Database {
 
     /// Get a single account by ID (without credentials).
     pub fn get_account(&self, id: &str) -> Result<Option<Account>> {
-        let mut stmt = self.conn().prepare(
-            "SELECT id, name, username, domain, smtp_host, smtp_port, imap_host, imap_port,
-                    smtp_username, imap_username, display_name, signature_text, signature_html,
-                    created_at
-             FROM accounts WHERE id = ?1",
-        )?;
+        let sql = format!("SELECT {ACCOUNT_COLS} FROM accounts WHERE id = ?1");
+        let mut stmt = self.conn().prepare_cached(&sql)?;
 
         let account = stmt
-            .query_row(params![id], |row| {
-                Ok(Account {
-                    id: row.get(0)?,
-                    name: row.get(1)?,
-                    username: row.get(2)?,
-                    domain: row.get(3)?,
-                    smtp_host: row.get(4)?,
-                    smtp_port: row.get(5)?,
-                    imap_host: row.get(6)?,
-                    imap_port: row.get(7)?,
-                    smtp_username: row.get(8)?,
-                    imap_username: row.get(9)?,
-                    display_name: row.get(10)?,
-                    signature_text: row.get(11)?,
-                    signature_html: row.get(12)?,
-                    created_at: row.get(13)?,
-                })
-            })
+            .query_row(params![id], Self::map_account)
             .optional()?;
 
         Ok(account)
@@ -114,32 +79,11 @@ impl Database {
 
     /// Find an account by email username.
     pub fn find_account_by_email(&self, email: &str) -> Result<Option<Account>> {
-        let mut stmt = self.conn().prepare(
-            "SELECT id, name, username, domain, smtp_host, smtp_port, imap_host, imap_port,
-                    smtp_username, imap_username, display_name, signature_text, signature_html,
-                    created_at
-             FROM accounts WHERE username = ?1",
-        )?;
+        let sql = format!("SELECT {ACCOUNT_COLS} FROM accounts WHERE username = ?1");
+        let mut stmt = self.conn().prepare(&sql)?;
 
         let account = stmt
-            .query_row(params![email], |row| {
-                Ok(Account {
-                    id: row.get(0)?,
-                    name: row.get(1)?,
-                    username: row.get(2)?,
-                    domain: row.get(3)?,
-                    smtp_host: row.get(4)?,
-                    smtp_port: row.get(5)?,
-                    imap_host: row.get(6)?,
-                    imap_port: row.get(7)?,
-                    smtp_username: row.get(8)?,
-                    imap_username: row.get(9)?,
-                    display_name: row.get(10)?,
-                    signature_text: row.get(11)?,
-                    signature_html: row.get(12)?,
-                    created_at: row.get(13)?,
-                })
-            })
+            .query_row(params![email], Self::map_account)
             .optional()?;
 
         Ok(account)
@@ -200,36 +144,37 @@ impl Database {
 
     /// Get the default (first) account, or None if no accounts exist.
     pub fn default_account(&self) -> Result<Option<Account>> {
-        let mut stmt = self.conn().prepare(
-            "SELECT id, name, username, domain, smtp_host, smtp_port, imap_host, imap_port,
-                    smtp_username, imap_username, display_name, signature_text, signature_html,
-                    created_at
-             FROM accounts ORDER BY created_at LIMIT 1",
-        )?;
+        let sql = format!("SELECT {ACCOUNT_COLS} FROM accounts ORDER BY created_at LIMIT 1");
+        let mut stmt = self.conn().prepare(&sql)?;
 
-        let account = stmt
-            .query_row([], |row| {
-                Ok(Account {
-                    id: row.get(0)?,
-                    name: row.get(1)?,
-                    username: row.get(2)?,
-                    domain: row.get(3)?,
-                    smtp_host: row.get(4)?,
-                    smtp_port: row.get(5)?,
-                    imap_host: row.get(6)?,
-                    imap_port: row.get(7)?,
-                    smtp_username: row.get(8)?,
-                    imap_username: row.get(9)?,
-                    display_name: row.get(10)?,
-                    signature_text: row.get(11)?,
-                    signature_html: row.get(12)?,
-                    created_at: row.get(13)?,
-                })
-            })
-            .optional()?;
+        let account = stmt.query_row([], Self::map_account).optional()?;
 
         Ok(account)
     }
+
+    fn map_account(row: &rusqlite::Row<'_>) -> rusqlite::Result<Account> {
+        let smtp_port: u16 = row.get(5)?;
+        let smtp_tls_mode: Option<String> = row.get(14)?;
+        Ok(Account {
+            id: row.get(0)?,
+            name: row.get(1)?,
+            username: row.get(2)?,
+            domain: row.get(3)?,
+            smtp_host: row.get(4)?,
+            smtp_port,
+            imap_host: row.get(6)?,
+            imap_port: row.get(7)?,
+            smtp_username: row.get(8)?,
+            imap_username: row.get(9)?,
+            display_name: row.get(10)?,
+            signature_text: row.get(11)?,
+            signature_html: row.get(12)?,
+            created_at: row.get(13)?,
+            smtp_tls_mode: smtp_tls_mode
+                .and_then(|m| m.parse().ok())
+                .unwrap_or_else(|| SmtpTlsMode::from_port(smtp_port)),
+        })
+    }
 }
 
 /// Extension trait for optional rusqlite query results.
@@ -302,6 +247,22 @@ mod tests {
         assert_eq!(creds.effective_smtp_username(), "user@example.com");
     }
 
+    #[test]
+    fn smtp_tls_mode_derived_from_port() {
+        let db = Database::open_memory().unwrap();
+        let starttls = db
+            .create_account("A", "a@b.com", "pw", "s.b.com", 587, "i.b.com", 993, "pp")
+            .unwrap();
+        let tls = db
+            .create_account("C", "c@d.com", "pw", "s.d.com", 465, "i.d.com", 993, "pp")
+            .unwrap();
+        assert_eq!(starttls.smtp_tls_mode, SmtpTlsMode::StartTls);
+        assert_eq!(tls.smtp_tls_mode, SmtpTlsMode::Tls);
+
+        let reloaded = db.get_account(&tls.id).unwrap().unwrap();
+        assert_eq!(reloaded.smtp_tls_mode, SmtpTlsMode::Tls);
+    }
+
     #[test]
     fn delete_account() {
         let db = Database::open_memory().unwrap();
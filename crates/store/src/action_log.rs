@@ -60,13 +60,13 @@ impl Database {
         Ok(action)
     }
 
-    /// List recent actions for an account, newest first.
+    /// List recent actions for an account, newest first (by insertion order).
     pub fn list_actions(&self, account_id: &str, limit: u32) -> Result<Vec<ActionLog>> {
         let mut stmt = self.conn().prepare(
             "SELECT id, account_id, action_type, confidence, justification, action_taken,
                     message_id, draft_id, created_at
              FROM action_log WHERE account_id = ?1
-             ORDER BY created_at DESC LIMIT ?2",
+             ORDER BY rowid DESC LIMIT ?2",
         )?;
 
         let actions = stmt
@@ -10,20 +10,17 @@
 //! - **keychain**: OS keychain via the `keyring` crate (macOS Keychain,
 //!   GNOME Keyring / KWallet on Linux). Requires the `keychain` cargo feature.
 
+use crate::crypto;
 use crate::errors::{Result, StoreError};
-use aes_gcm::{
-    Aes256Gcm, Nonce,
-    aead::{Aead, KeyInit, OsRng},
-};
+use aes_gcm::aead::OsRng;
 use argon2::Argon2;
 use base64::{Engine, engine::general_purpose::STANDARD as B64};
 use rand::RngCore;
 use serde::{Deserialize, Serialize};
 use std::collections::HashMap;
 use std::path::PathBuf;
+use std::sync::OnceLock;
 
-const SALT_LEN: usize = 16;
-const NONCE_LEN: usize = 12;
 const SERVICE_NAME: &str = "envelope-email";
 const MASTER_KEY_ENTRY: &str = "master-key";
 
@@ -79,12 +76,26 @@ fn credentials_path() -> PathBuf {
     config_dir.join("envelope-email").join("credentials.json")
 }
 
+/// Master key for file-based storage, derived once per process.
+///
+/// Its inputs (the environment, hostname and user) don't change while we
+/// run, and the machine-seed path costs an Argon2 hash — too much to repeat
+/// on every credential lookup the dashboard makes.
+fn file_master_key() -> Result<String> {
+    static FILE_MASTER_KEY: OnceLock<String> = OnceLock::new();
+    if let Some(key) = FILE_MASTER_KEY.get() {
+        return Ok(key.clone());
+    }
+    let key = derive_file_master_key()?;
+    Ok(FILE_MASTER_KEY.get_or_init(|| key).clone())
+}
+
 /// Derive the master passphrase for file-based storage.
 ///
 /// Priority:
 /// 1. `ENVELOPE_MASTER_KEY` environment variable (explicit)
 /// 2. Machine-specific seed: SHA-256(hostname + username)
-fn file_master_key() -> Result<String> {
+fn derive_file_master_key() -> Result<String> {
     if let Ok(key) = std::env::var("ENVELOPE_MASTER_KEY") {
         if !key.is_empty() {
             return Ok(key);
@@ -148,66 +159,6 @@ fn write_credential_file(cf: &CredentialFile) -> Result<()> {
     Ok(())
 }
 
-/// Derive a 256-bit key from a passphrase using Argon2id.
-fn derive_key(passphrase: &str, salt: &[u8]) -> Result<[u8; 32]> {
-    let mut key = [0u8; 32];
-    Argon2::default()
-        .hash_password_into(passphrase.as_bytes(), salt, &mut key)
-        .map_err(|e| StoreError::Encryption(format!("key derivation failed: {e}")))?;
-    Ok(key)
-}
-
-/// Encrypt plaintext using AES-256-GCM with Argon2id key derivation.
-/// Returns base64-encoded: salt (16) || nonce (12) || ciphertext.
-fn encrypt_value(plaintext: &str, passphrase: &str) -> Result<String> {
-    let mut salt = [0u8; SALT_LEN];
-    OsRng.fill_bytes(&mut salt);
-
-    let mut nonce_bytes = [0u8; NONCE_LEN];
-    OsRng.fill_bytes(&mut nonce_bytes);
-    let nonce = Nonce::from_slice(&nonce_bytes);
-
-    let key = derive_key(passphrase, &salt)?;
-    let cipher =
-        Aes256Gcm::new_from_slice(&key).map_err(|e| StoreError::Encryption(e.to_string()))?;
-
-    let ciphertext = cipher
-        .encrypt(nonce, plaintext.as_bytes())
-        .map_err(|e| StoreError::Encryption(e.to_string()))?;
-
-    let mut combined = Vec::with_capacity(SALT_LEN + NONCE_LEN + ciphertext.len());
-    combined.extend_from_slice(&salt);
-    combined.extend_from_slice(&nonce_bytes);
-    combined.extend_from_slice(&ciphertext);
-
-    Ok(B64.encode(&combined))
-}
-
-/// Decrypt a base64-encoded ciphertext (salt || nonce || ct) using AES-256-GCM.
-fn decrypt_value(encoded: &str, passphrase: &str) -> Result<String> {
-    let combined = B64
-        .decode(encoded)
-        .map_err(|e| StoreError::Decryption(format!("invalid base64: {e}")))?;
-
-    if combined.len() < SALT_LEN + NONCE_LEN + 1 {
-        return Err(StoreError::Decryption("ciphertext too short".into()));
-    }
-
-    let (salt, rest) = combined.split_at(SALT_LEN);
-    let (nonce_bytes, ciphertext) = rest.split_at(NONCE_LEN);
-    let nonce = Nonce::from_slice(nonce_bytes);
-
-    let key = derive_key(passphrase, salt)?;
-    let cipher =
-        Aes256Gcm::new_from_slice(&key).map_err(|e| StoreError::Decryption(e.to_string()))?;
-
-    let plaintext = cipher
-        .decrypt(nonce, ciphertext)
-        .map_err(|e| StoreError::Decryption(e.to_string()))?;
-
-    String::from_utf8(plaintext).map_err(|e| StoreError::Decryption(format!("invalid utf8: {e}")))
-}
-
 // ---------------------------------------------------------------------------
 // Public API
 // ---------------------------------------------------------------------------
@@ -236,7 +187,7 @@ fn file_get_or_create_passphrase() -> Result<String> {
     // The master-key entry holds the actual random passphrase, encrypted with
     // the machine-derived master key.
     if let Some(encrypted) = cf.entries.get(MASTER_KEY_ENTRY) {
-        return decrypt_value(encrypted, &master);
+        return crypto::decrypt(encrypted, &master);
     }
 
     // First time: generate a random passphrase, encrypt, store.
@@ -244,7 +195,7 @@ fn file_get_or_create_passphrase() -> Result<String> {
     OsRng.fill_bytes(&mut bytes);
     let passphrase = B64.encode(bytes);
 
-    let encrypted = encrypt_value(&passphrase, &master)?;
+    let encrypted = crypto::encrypt(&passphrase, &master)?;
     cf.entries.insert(MASTER_KEY_ENTRY.to_string(), encrypted);
     write_credential_file(&cf)?;
 
@@ -298,7 +249,7 @@ pub fn migrate_keychain_to_file() -> Result<bool> {
                 // Store it in the file backend
                 let master = file_master_key()?;
                 let mut cf = read_credential_file()?;
-                let encrypted = encrypt_value(&keychain_passphrase, &master)?;
+                let encrypted = crypto::encrypt(&keychain_passphrase, &master)?;
                 cf.entries.insert(MASTER_KEY_ENTRY.to_string(), encrypted);
                 write_credential_file(&cf)?;
                 Ok(true)
@@ -318,22 +269,6 @@ pub fn migrate_keychain_to_file() -> Result<bool> {
 mod tests {
     use super::*;
 
-    #[test]
-    fn encrypt_decrypt_roundtrip() {
-        let passphrase = "test-passphrase-123";
-        let plaintext = "my-secret-password";
-        let encrypted = encrypt_value(plaintext, passphrase).unwrap();
-        let decrypted = decrypt_value(&encrypted, passphrase).unwrap();
-        assert_eq!(plaintext, decrypted);
-    }
-
-    #[test]
-    fn wrong_passphrase_fails() {
-        let encrypted = encrypt_value("secret", "correct-pass").unwrap();
-        let result = decrypt_value(&encrypted, "wrong-pass");
-        assert!(result.is_err());
-    }
-
     #[test]
     fn file_master_key_is_deterministic() {
         // Set env var for deterministic testing
@@ -341,8 +276,8 @@ mod tests {
         unsafe {
             std::env::set_var("ENVELOPE_MASTER_KEY", "test-master-key-1234");
         }
-        let k1 = file_master_key().unwrap();
-        let k2 = file_master_key().unwrap();
+        let k1 = derive_file_master_key().unwrap();
+        let k2 = derive_file_master_key().unwrap();
         assert_eq!(k1, k2);
         unsafe {
             std::env::remove_var("ENVELOPE_MASTER_KEY");
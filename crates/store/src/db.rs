@@ -5,6 +5,14 @@ use crate::errors::{Result, StoreError};
 use rusqlite::Connection;
 use std::path::PathBuf;
 
+/// Capacity of the per-connection prepared statement cache. The hot
+/// paths (thread sync, event insert, account lookup, the dashboard's
+/// scheduled-send and unsnooze sweeps) use `prepare_cached`; rusqlite's
+/// default of 16 is too small to keep them all resident alongside the
+/// arity variants of `find_thread_by_references` and
+/// `find_thread_by_first_message_id`.
+const STATEMENT_CACHE_CAPACITY: usize = 64;
+
 pub struct Database {
     conn: Connection,
 }
@@ -35,9 +43,17 @@ impl Database {
     /// Open or create the database at a specific path.
     pub fn open(path: &std::path::Path) -> Result<Self> {
         let mut conn = Connection::open(path)?;
-        conn.execute_batch("PRAGMA journal_mode=WAL; PRAGMA busy_timeout=5000;")?;
+        // NORMAL sync is durable under WAL except for the last commits on
+        // power loss, and skips an fsync per transaction.
+        conn.execute_batch(
+            "PRAGMA journal_mode=WAL;
+             PRAGMA busy_timeout=5000;
+             PRAGMA synchronous=NORMAL;
+             PRAGMA temp_store=MEMORY;",
+        )?;
         crate::migrations::run(&mut conn)
             .map_err(|e| StoreError::Migration(format!("{e}")))?;
+        conn.set_prepared_statement_cache_capacity(STATEMENT_CACHE_CAPACITY);
         Ok(Self { conn })
     }
 
@@ -46,6 +62,7 @@ impl Database {
         let mut conn = Connection::open_in_memory()?;
         crate::migrations::run(&mut conn)
             .map_err(|e| StoreError::Migration(format!("{e}")))?;
+        conn.set_prepared_statement_cache_capacity(STATEMENT_CACHE_CAPACITY);
         Ok(Self { conn })
     }
 
@@ -5,8 +5,22 @@ use crate::db::Database;
 use crate::errors::{Result, StoreError};
 use crate::models::{Draft, DraftStatus};
 use rusqlite::params;
+use rusqlite::types::ValueRef;
+use serde::de::DeserializeOwned;
 use uuid::Uuid;
 
+/// Decode a JSON text column straight from SQLite's buffer instead of
+/// copying it into a `String` first. NULL or malformed JSON reads as `None`.
+fn json_column<T: DeserializeOwned>(
+    row: &rusqlite::Row<'_>,
+    idx: usize,
+) -> rusqlite::Result<Option<T>> {
+    Ok(match row.get_ref(idx)? {
+        ValueRef::Text(bytes) | ValueRef::Blob(bytes) => serde_json::from_slice(bytes).ok(),
+        _ => None,
+    })
+}
+
 impl Database {
     pub fn create_draft(
         &self,
@@ -49,41 +63,11 @@ impl Database {
             "SELECT id, account_id, status, to_addr, cc_addr, bcc_addr, reply_to, subject,
                     text_content, html_content, in_reply_to, metadata, attachments, message_id,
                     send_after, snoozed_until, created_at, updated_at, sent_at, created_by,
-                    imap_uid
+                    imap_uid, send_attempts
              FROM drafts WHERE id = ?1",
         )?;
 
-        let draft = stmt
-            .query_row(params![id], |row| {
-                let status_str: String = row.get(2)?;
-                let metadata_str: Option<String> = row.get(11)?;
-                let attachments_str: String = row.get(12)?;
-                let imap_uid_i64: Option<i64> = row.get(20)?;
-                Ok(Draft {
-                    id: row.get(0)?,
-                    account_id: row.get(1)?,
-                    status: status_str.parse().unwrap_or(DraftStatus::Draft),
-                    to_addr: row.get(3)?,
-                    cc_addr: row.get(4)?,
-                    bcc_addr: row.get(5)?,
-                    reply_to: row.get(6)?,
-                    subject: row.get(7)?,
-                    text_content: row.get(8)?,
-                    html_content: row.get(9)?,
-                    in_reply_to: row.get(10)?,
-                    metadata: metadata_str.and_then(|s| serde_json::from_str(&s).ok()),
-                    attachments: serde_json::from_str(&attachments_str).unwrap_or_default(),
-                    message_id: row.get(13)?,
-                    send_after: row.get(14)?,
-                    snoozed_until: row.get(15)?,
-                    created_at: row.get(16)?,
-                    updated_at: row.get(17)?,
-                    sent_at: row.get(18)?,
-                    created_by: row.get(19)?,
-                    imap_uid: imap_uid_i64.map(|v| v as u32),
-                })
-            })
-            .optional()?;
+        let draft = stmt.query_row(params![id], Self::map_draft).optional()?;
 
         Ok(draft)
     }
@@ -99,14 +83,14 @@ impl Database {
             "SELECT id, account_id, status, to_addr, cc_addr, bcc_addr, reply_to, subject,
                     text_content, html_content, in_reply_to, metadata, attachments, message_id,
                     send_after, snoozed_until, created_at, updated_at, sent_at, created_by,
-                    imap_uid
+                    imap_uid, send_attempts
              FROM drafts WHERE account_id = ?1 AND status = ?2
              ORDER BY updated_at DESC LIMIT ?3 OFFSET ?4"
         } else {
             "SELECT id, account_id, status, to_addr, cc_addr, bcc_addr, reply_to, subject,
                     text_content, html_content, in_reply_to, metadata, attachments, message_id,
                     send_after, snoozed_until, created_at, updated_at, sent_at, created_by,
-                    imap_uid
+                    imap_uid, send_attempts
              FROM drafts WHERE account_id = ?1
              ORDER BY updated_at DESC LIMIT ?3 OFFSET ?4"
         };
@@ -141,18 +125,19 @@ impl Database {
     }
 
     pub fn mark_draft_sent(&self, id: &str, message_id: Option<&str>) -> Result<()> {
-        self.conn().execute(
-            "UPDATE drafts SET status = 'sent', message_id = ?1,
-             sent_at = datetime('now'), updated_at = datetime('now') WHERE id = ?2",
-            params![message_id, id],
-        )?;
+        self.conn()
+            .prepare_cached(
+                "UPDATE drafts SET status = 'sent', message_id = ?1,
+                 sent_at = datetime('now'), updated_at = datetime('now') WHERE id = ?2",
+            )?
+            .execute(params![message_id, id])?;
         Ok(())
     }
 
     pub fn discard_draft(&self, id: &str) -> Result<bool> {
         let rows = self.conn().execute(
             "UPDATE drafts SET status = 'discarded', updated_at = datetime('now')
-             WHERE id = ?1 AND status IN ('draft', 'pending_review', 'blocked')",
+             WHERE id = ?1 AND status IN ('draft', 'pending_review', 'blocked', 'failed')",
             params![id],
         )?;
         Ok(rows > 0)
@@ -167,22 +152,146 @@ impl Database {
         Ok(())
     }
 
-    /// Query drafts that are due for scheduled sending.
-    pub fn list_drafts_due_for_send(&self) -> Result<Vec<Draft>> {
-        let mut stmt = self.conn().prepare(
-            "SELECT id, account_id, status, to_addr, cc_addr, bcc_addr, reply_to, subject,
-                    text_content, html_content, in_reply_to, metadata, attachments, message_id,
-                    send_after, snoozed_until, created_at, updated_at, sent_at, created_by,
-                    imap_uid
-             FROM drafts
+    /// Atomically claim every draft that is due for scheduled sending.
+    ///
+    /// A single `UPDATE … RETURNING` flips the due drafts to `sending` and
+    /// hands them back, so no other sweeper can pick up the same row. Callers
+    /// must finish each claim with [`Database::mark_draft_sent`],
+    /// [`Database::release_draft_claim`] or [`Database::fail_draft_claim`],
+    /// and should [`Database::renew_draft_claim`] right before sending.
+    pub fn claim_drafts_due_for_send(&self) -> Result<Vec<Draft>> {
+        let mut stmt = self.conn().prepare_cached(
+            "UPDATE drafts SET status = 'sending', claimed_at = datetime('now'),
+                    updated_at = datetime('now')
              WHERE status = 'draft'
                AND send_after IS NOT NULL
                AND datetime(send_after) <= datetime('now')
-             ORDER BY send_after ASC",
+             RETURNING id, account_id, status, to_addr, cc_addr, bcc_addr, reply_to, subject,
+                       text_content, html_content, in_reply_to, metadata, attachments,
+                       message_id, send_after, snoozed_until, created_at, updated_at, sent_at,
+                       created_by, imap_uid, send_attempts",
         )?;
 
         let rows = stmt.query_map([], Self::map_draft)?;
-        Ok(rows.filter_map(|r| r.ok()).collect())
+        let mut drafts: Vec<Draft> = rows.filter_map(|r| r.ok()).collect();
+        // RETURNING order is unspecified; send the oldest schedules first.
+        drafts.sort_by(|a, b| a.send_after.cmp(&b.send_after));
+        Ok(drafts)
+    }
+
+    /// Refresh a claim's timestamp just before its send starts, so claims
+    /// queued behind other sends are not mistaken for orphans. Returns `false`
+    /// when the claim is no longer held and the draft must not be sent.
+    pub fn renew_draft_claim(&self, id: &str) -> Result<bool> {
+        let rows = self
+            .conn()
+            .prepare_cached(
+                "UPDATE drafts SET claimed_at = datetime('now')
+                 WHERE id = ?1 AND status = 'sending'",
+            )?
+            .execute(params![id])?;
+        Ok(rows > 0)
+    }
+
+    /// Return a claimed draft to `draft` status after a failed send and push
+    /// its `send_after` back so a later sweep retries it.
+    ///
+    /// `backoff_secs` is the retry schedule: the n-th consecutive failure
+    /// waits `backoff_secs[n - 1]` seconds, and the last entry repeats. Once
+    /// a draft has failed `max_attempts` times it is marked `failed` instead.
+    pub fn release_draft_claim(
+        &self,
+        id: &str,
+        backoff_secs: &[u64],
+        max_attempts: u32,
+    ) -> Result<()> {
+        use rusqlite::OptionalExtension;
+
+        // The status flip and the pushed-back `send_after` must land
+        // together: in between, the row would be a due draft that the next
+        // sweep could reclaim immediately.
+        let tx = self.conn().unchecked_transaction()?;
+        let attempts: Option<u32> = tx
+            .prepare_cached(
+                "UPDATE drafts SET send_attempts = send_attempts + 1,
+                        status = CASE WHEN send_attempts + 1 >= ?2 THEN 'failed' ELSE 'draft' END,
+                        updated_at = datetime('now')
+                 WHERE id = ?1 AND status = 'sending'
+                 RETURNING send_attempts",
+            )?
+            .query_row(params![id, max_attempts], |row| row.get(0))
+            .optional()?;
+
+        if let (Some(attempts), Some(&last)) = (attempts, backoff_secs.last())
+            && attempts < max_attempts
+        {
+            let delay = backoff_secs
+                .get(attempts.saturating_sub(1) as usize)
+                .copied()
+                .unwrap_or(last);
+            tx.prepare_cached(
+                "UPDATE drafts SET send_after = strftime('%Y-%m-%dT%H:%M:%S', 'now', ?2)
+                 WHERE id = ?1",
+            )?
+            .execute(params![id, format!("+{delay} seconds")])?;
+        }
+        tx.commit()?;
+        Ok(())
+    }
+
+    /// Settle a claim as `failed` without retrying — for errors another
+    /// attempt cannot fix, such as a permanent SMTP rejection.
+    pub fn fail_draft_claim(&self, id: &str) -> Result<()> {
+        self.conn()
+            .prepare_cached(
+                "UPDATE drafts SET status = 'failed', send_attempts = send_attempts + 1,
+                        updated_at = datetime('now')
+                 WHERE id = ?1 AND status = 'sending'",
+            )?
+            .execute(params![id])?;
+        Ok(())
+    }
+
+    /// Release claims taken or renewed more than `stale_after_secs` ago.
+    ///
+    /// Live senders renew a claim right before sending, so a claim this old
+    /// was left behind by a process that died mid-send. Younger claims may
+    /// still belong to another running process and are left alone; releasing
+    /// them would send those drafts twice.
+    pub fn recover_orphaned_sends(&self, stale_after_secs: u64) -> Result<usize> {
+        let rows = self
+            .conn()
+            .prepare_cached(
+                "UPDATE drafts SET status = 'draft', claimed_at = NULL,
+                        updated_at = datetime('now')
+                 WHERE status = 'sending'
+                   AND (claimed_at IS NULL OR claimed_at <= datetime('now', ?1))",
+            )?
+            .execute(params![format!("-{stale_after_secs} seconds")])?;
+        Ok(rows)
+    }
+
+    /// Seconds until the earliest scheduled draft that is not yet due, or
+    /// `None` when nothing is scheduled in the future. Lets the scheduler sleep
+    /// until the next send instead of polling on a fixed tick.
+    pub fn seconds_until_next_scheduled_send(&self) -> Result<Option<f64>> {
+        use rusqlite::OptionalExtension;
+
+        // ORDER BY … LIMIT 1 on the indexed expression is a single seek into
+        // idx_drafts_due; MIN() over a different expression would scan.
+        let seconds = self
+            .conn()
+            .prepare_cached(
+                "SELECT (julianday(datetime(send_after)) - julianday('now')) * 86400.0
+                 FROM drafts
+                 WHERE status = 'draft'
+                   AND datetime(send_after) > datetime('now')
+                 ORDER BY datetime(send_after)
+                 LIMIT 1",
+            )?
+            .query_row([], |row| row.get::<_, Option<f64>>(0))
+            .optional()?;
+        Ok(seconds.flatten())
     }
 
     /// Store the IMAP UID assigned by the server after APPEND to the Drafts folder.
@@ -205,8 +314,6 @@ impl Database {
 
     fn map_draft(row: &rusqlite::Row<'_>) -> rusqlite::Result<Draft> {
         let status_str: String = row.get(2)?;
-        let metadata_str: Option<String> = row.get(11)?;
-        let attachments_str: String = row.get(12)?;
         let imap_uid_i64: Option<i64> = row.get(20)?;
         Ok(Draft {
             id: row.get(0)?,
@@ -220,8 +327,8 @@ impl Database {
             text_content: row.get(8)?,
             html_content: row.get(9)?,
             in_reply_to: row.get(10)?,
-            metadata: metadata_str.and_then(|s| serde_json::from_str(&s).ok()),
-            attachments: serde_json::from_str(&attachments_str).unwrap_or_default(),
+            metadata: json_column(row, 11)?,
+            attachments: json_column(row, 12)?.unwrap_or_default(),
             message_id: row.get(13)?,
             send_after: row.get(14)?,
             snoozed_until: row.get(15)?,
@@ -230,6 +337,7 @@ impl Database {
             sent_at: row.get(18)?,
             created_by: row.get(19)?,
             imap_uid: imap_uid_i64.map(|v| v as u32),
+            send_attempts: row.get(21)?,
         })
     }
 }
@@ -293,6 +401,48 @@ mod tests {
         assert_eq!(fetched.imap_uid, None);
     }
 
+    #[test]
+    fn json_columns_decode() {
+        let db = setup();
+        let draft = db
+            .create_draft(
+                "acc1",
+                "a@test.com",
+                None,
+                None,
+                None,
+                None,
+                None,
+                None,
+                None,
+            )
+            .unwrap();
+        assert_eq!(draft.metadata, None);
+        assert!(draft.attachments.is_empty());
+
+        db.conn()
+            .execute(
+                "UPDATE drafts SET metadata = '{\"score\": 0.5}', attachments = '[{\"name\": \"a.pdf\"}]' WHERE id = ?1",
+                params![draft.id],
+            )
+            .unwrap();
+        let fetched = db.get_draft(&draft.id).unwrap().unwrap();
+        assert_eq!(fetched.metadata, Some(serde_json::json!({ "score": 0.5 })));
+        assert_eq!(
+            fetched.attachments,
+            vec![serde_json::json!({ "name": "a.pdf" })]
+        );
+
+        db.conn()
+            .execute(
+                "UPDATE drafts SET metadata = 'not json' WHERE id = ?1",
+                params![draft.id],
+            )
+            .unwrap();
+        let fetched = db.get_draft(&draft.id).unwrap().unwrap();
+        assert_eq!(fetched.metadata, None);
+    }
+
     #[test]
     fn discard_draft() {
         let db = setup();
@@ -387,4 +537,116 @@ mod tests {
         assert_eq!(drafts.len(), 1);
         assert_eq!(drafts[0].imap_uid, Some(99));
     }
+
+    #[test]
+    fn seconds_until_next_scheduled_send() {
+        let db = setup();
+        assert_eq!(db.seconds_until_next_scheduled_send().unwrap(), None);
+
+        let due = db
+            .create_draft("acc1", "a@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        db.update_draft_send_after(&due.id, "2020-01-01T00:00:00").unwrap();
+        // Already-due drafts are the sweep's business, not a future wake-up.
+        assert_eq!(db.seconds_until_next_scheduled_send().unwrap(), None);
+
+        let later = db
+            .create_draft("acc1", "b@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        db.update_draft_send_after(&later.id, "2099-01-01T00:00:00").unwrap();
+        let seconds = db.seconds_until_next_scheduled_send().unwrap().unwrap();
+        assert!(seconds > 0.0);
+    }
+
+    #[test]
+    fn claim_drafts_due_for_send_is_exclusive() {
+        let db = setup();
+        let due = db
+            .create_draft("acc1", "a@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        db.update_draft_send_after(&due.id, "2020-01-01T00:00:00").unwrap();
+        let later = db
+            .create_draft("acc1", "b@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        db.update_draft_send_after(&later.id, "2099-01-01T00:00:00").unwrap();
+
+        let claimed = db.claim_drafts_due_for_send().unwrap();
+        assert_eq!(claimed.len(), 1);
+        assert_eq!(claimed[0].id, due.id);
+        assert_eq!(claimed[0].status, DraftStatus::Sending);
+        assert!(db.claim_drafts_due_for_send().unwrap().is_empty());
+
+        db.release_draft_claim(&due.id, &[], 10).unwrap();
+        assert_eq!(db.claim_drafts_due_for_send().unwrap().len(), 1);
+        assert!(db.renew_draft_claim(&due.id).unwrap());
+        // A fresh claim may belong to another live process.
+        assert_eq!(db.recover_orphaned_sends(600).unwrap(), 0);
+        db.conn()
+            .execute(
+                "UPDATE drafts SET claimed_at = datetime('now', '-601 seconds')",
+                [],
+            )
+            .unwrap();
+        assert_eq!(db.recover_orphaned_sends(600).unwrap(), 1);
+        assert_eq!(db.get_draft(&due.id).unwrap().unwrap().status, DraftStatus::Draft);
+        assert!(!db.renew_draft_claim(&due.id).unwrap());
+    }
+
+    #[test]
+    fn release_draft_claim_backs_off() {
+        let db = setup();
+        let draft = db
+            .create_draft("acc1", "a@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        let backoff: [u64; 2] = [30, 600];
+        let next_retry = || {
+            db.conn()
+                .execute("UPDATE drafts SET send_after = '2020-01-01T00:00:00'", [])
+                .unwrap();
+            assert_eq!(db.claim_drafts_due_for_send().unwrap().len(), 1);
+            db.release_draft_claim(&draft.id, &backoff, 10).unwrap();
+            db.seconds_until_next_scheduled_send().unwrap().unwrap()
+        };
+
+        assert!((28.0..=31.0).contains(&next_retry()));
+        assert!((598.0..=601.0).contains(&next_retry()));
+        // The last entry repeats.
+        assert!((598.0..=601.0).contains(&next_retry()));
+    }
+
+    #[test]
+    fn failed_claims_stop_retrying() {
+        let db = setup();
+        let draft = db
+            .create_draft("acc1", "a@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        let fail_once = || {
+            db.conn()
+                .execute("UPDATE drafts SET send_after = '2020-01-01T00:00:00'", [])
+                .unwrap();
+            assert_eq!(db.claim_drafts_due_for_send().unwrap().len(), 1);
+            db.release_draft_claim(&draft.id, &[30], 2).unwrap();
+            db.get_draft(&draft.id).unwrap().unwrap().status
+        };
+
+        assert_eq!(fail_once(), DraftStatus::Draft);
+        assert_eq!(fail_once(), DraftStatus::Failed);
+        assert!(db.claim_drafts_due_for_send().unwrap().is_empty());
+
+        let rejected = db
+            .create_draft("acc1", "b@test.com", None, None, None, None, None, None, None)
+            .unwrap();
+        db.update_draft_send_after(&rejected.id, "2020-01-01T00:00:00").unwrap();
+        assert_eq!(db.claim_drafts_due_for_send().unwrap().len(), 1);
+        db.fail_draft_claim(&rejected.id).unwrap();
+        let fetched = db.get_draft(&rejected.id).unwrap().unwrap();
+        assert_eq!(fetched.status, DraftStatus::Failed);
+        assert_eq!(fetched.send_attempts, 1);
+
+        // Failed sends stay listable and can be cleared by the user.
+        let failed = db.list_drafts("acc1", Some("failed"), 100, 0).unwrap();
+        assert_eq!(failed.len(), 2);
+        assert_eq!(db.get_draft(&draft.id).unwrap().unwrap().send_attempts, 2);
+        assert!(db.discard_draft(&rejected.id).unwrap());
+    }
 }
@@ -8,10 +8,12 @@ use crate::models::Event;
 impl Database {
     /// Insert an event into the events table.
     pub fn insert_event(&self, event: &Event) -> Result<()> {
-        self.conn().execute(
-            "INSERT INTO events (id, account_id, event_type, folder, uid, message_id, from_addr, subject, snippet, payload, created_at)
-             VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11)",
-            rusqlite::params![
+        self.conn()
+            .prepare_cached(
+                "INSERT INTO events (id, account_id, event_type, folder, uid, message_id, from_addr, subject, snippet, payload, created_at)
+                 VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11)",
+            )?
+            .execute(rusqlite::params![
                 event.id,
                 event.account_id,
                 event.event_type,
@@ -23,12 +25,15 @@ impl Database {
                 event.snippet,
                 event.payload,
                 event.created_at,
-            ],
-        )?;
+            ])?;
         Ok(())
     }
 
-    /// List recent events, optionally filtered by account.
+    /// List recent events, newest first, optionally filtered by account.
+    ///
+    /// Ordered by rowid (insertion order) rather than the `created_at`
+    /// TEXT column: integer compares, no sort step, and no ties between
+    /// events recorded within the same second.
     pub fn list_events(
         &self,
         account_id: Option<&str>,
@@ -37,12 +42,12 @@ impl Database {
         let (sql, params): (&str, Vec<Box<dyn rusqlite::types::ToSql>>) = match account_id {
             Some(id) => (
                 "SELECT id, account_id, event_type, folder, uid, message_id, from_addr, subject, snippet, payload, created_at
-                 FROM events WHERE account_id = ?1 ORDER BY created_at DESC LIMIT ?2",
+                 FROM events WHERE account_id = ?1 ORDER BY rowid DESC LIMIT ?2",
                 vec![Box::new(id.to_string()), Box::new(limit as i64)],
             ),
             None => (
                 "SELECT id, account_id, event_type, folder, uid, message_id, from_addr, subject, snippet, payload, created_at
-                 FROM events ORDER BY created_at DESC LIMIT ?1",
+                 FROM events ORDER BY rowid DESC LIMIT ?1",
                 vec![Box::new(limit as i64)],
             ),
         };
@@ -85,7 +90,7 @@ impl Database {
     ) -> Result<Vec<Event>> {
         let mut stmt = self.conn().prepare(
             "SELECT id, account_id, event_type, folder, uid, message_id, from_addr, subject, snippet, payload, created_at
-             FROM events WHERE account_id = ?1 AND created_at > ?2 ORDER BY created_at ASC",
+             FROM events WHERE account_id = ?1 AND created_at > ?2 ORDER BY rowid ASC",
         )?;
         let rows = stmt.query_map(rusqlite::params![account_id, since], |row: &rusqlite::Row| {
             Ok(Event {
@@ -170,4 +175,33 @@ mod tests {
         assert_eq!(db.list_events(Some("acc-1"), 10).unwrap().len(), 1);
         assert_eq!(db.list_events(None, 10).unwrap().len(), 2);
     }
+
+    #[test]
+    fn list_events_newest_first_within_same_second() {
+        let db = test_db();
+        for i in 0..3 {
+            db.insert_event(&Event {
+                id: format!("evt-{i}"),
+                account_id: "acc-1".to_string(),
+                event_type: "new_message".to_string(),
+                folder: "INBOX".to_string(),
+                uid: Some(i),
+                message_id: None,
+                from_addr: None,
+                subject: None,
+                snippet: None,
+                payload: None,
+                created_at: "2026-04-19T12:00:00".to_string(),
+            })
+            .unwrap();
+        }
+
+        let uids: Vec<Option<i64>> = db
+            .list_events(Some("acc-1"), 10)
+            .unwrap()
+            .into_iter()
+            .map(|e| e.uid)
+            .collect();
+        assert_eq!(uids, vec![Some(2), Some(1), Some(0)]);
+    }
 }
@@ -276,6 +276,48 @@ fn migrations() -> Migrations<'static> {
                 ON contacts(email);
             ",
         ),
+        // ── Migration 4: rowid-ordered log indexes ──────────────────
+        // events and action_log are append-only, so rowid is monotonic in
+        // insert order. An index on account_id alone stores entries sorted
+        // by (account_id, rowid), letting "newest first" listings walk the
+        // index backwards instead of sorting created_at TEXT values.
+        M::up(
+            "
+            CREATE INDEX IF NOT EXISTS idx_events_account_rowid
+                ON events(account_id);
+            CREATE INDEX IF NOT EXISTS idx_action_log_account_rowid
+                ON action_log(account_id);
+            ",
+        ),
+        // ── Migration 5: precomputed SMTP TLS mode ──────────────────
+        // Backfill from the port using the same rule as
+        // SmtpTlsMode::from_port: 465 is implicit TLS, everything else
+        // STARTTLS.
+        M::up(
+            "
+            ALTER TABLE accounts ADD COLUMN smtp_tls_mode TEXT;
+            UPDATE accounts
+               SET smtp_tls_mode = CASE smtp_port WHEN 465 THEN 'tls' ELSE 'starttls' END
+             WHERE smtp_tls_mode IS NULL;
+            ",
+        ),
+        // ── Migration 6: scheduled-send retry bookkeeping ───────────
+        // Failed scheduled sends back off based on how often they failed.
+        M::up("ALTER TABLE drafts ADD COLUMN send_attempts INTEGER NOT NULL DEFAULT 0;"),
+        // ── Migration 7: due-time index for scheduled sends ─────────
+        // The scheduler compares datetime(send_after) so mixed timestamp
+        // formats order correctly; index that expression so claiming due
+        // drafts and finding the next one are range seeks, not scans.
+        M::up(
+            "
+            CREATE INDEX IF NOT EXISTS idx_drafts_due
+                ON drafts(datetime(send_after)) WHERE status = 'draft';
+            ",
+        ),
+        // ── Migration 8: scheduled-send claim timestamp ─────────────
+        // Lets orphan recovery tell a claim abandoned by a dead process from
+        // one another process is still sending.
+        M::up("ALTER TABLE drafts ADD COLUMN claimed_at TEXT;"),
     ])
 }
 
@@ -19,6 +19,50 @@ pub struct Account {
     pub signature_text: Option<String>,
     pub signature_html: Option<String>,
     pub created_at: String,
+    /// How the SMTP connection is secured. Resolved once when the account
+    /// is stored so senders don't re-derive it from the port.
+    pub smtp_tls_mode: SmtpTlsMode,
+}
+
+/// Transport security for an account's SMTP connection.
+#[derive(Debug, Clone, Copy, Serialize, Deserialize, PartialEq, Eq)]
+#[serde(rename_all = "snake_case")]
+pub enum SmtpTlsMode {
+    /// Plaintext greeting upgraded with STARTTLS (typically port 587).
+    #[serde(rename = "starttls")]
+    StartTls,
+    /// Implicit TLS from the first byte (SMTPS, port 465).
+    Tls,
+}
+
+impl SmtpTlsMode {
+    /// Infer the mode from a submission port. Port 465 is implicit TLS;
+    /// everything else requires STARTTLS so credentials never go out in
+    /// the clear.
+    pub fn from_port(port: u16) -> Self {
+        match port {
+            465 => Self::Tls,
+            _ => Self::StartTls,
+        }
+    }
+
+    pub fn as_str(&self) -> &str {
+        match self {
+            Self::StartTls => "starttls",
+            Self::Tls => "tls",
+        }
+    }
+}
+
+impl std::str::FromStr for SmtpTlsMode {
+    type Err = String;
+    fn from_str(s: &str) -> std::result::Result<Self, Self::Err> {
+        match s {
+            "starttls" => Ok(Self::StartTls),
+            "tls" => Ok(Self::Tls),
+            _ => Err(format!("unknown SMTP TLS mode: {s}")),
+        }
+    }
 }
 
 /// Account with decrypted credentials — never serialize to JSON output.
@@ -78,6 +122,9 @@ pub struct Draft {
     /// IMAP UID of the draft in the server's Drafts folder (if synced).
     #[serde(skip_serializing_if = "Option::is_none")]
     pub imap_uid: Option<u32>,
+    /// Failed scheduled-send attempts so far.
+    #[serde(default)]
+    pub send_attempts: u32,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize, PartialEq)]
@@ -86,8 +133,13 @@ pub enum DraftStatus {
     Draft,
     PendingReview,
     Blocked,
+    /// Claimed by a scheduled-send sweep; the SMTP send is in progress.
+    Sending,
     Sent,
     Discarded,
+    /// Scheduled send gave up: the server rejected the message permanently
+    /// or the retry budget ran out.
+    Failed,
 }
 
 impl DraftStatus {
@@ -96,8 +148,10 @@ impl DraftStatus {
             Self::Draft => "draft",
             Self::PendingReview => "pending_review",
             Self::Blocked => "blocked",
+            Self::Sending => "sending",
             Self::Sent => "sent",
             Self::Discarded => "discarded",
+            Self::Failed => "failed",
         }
     }
 
@@ -113,8 +167,10 @@ impl std::str::FromStr for DraftStatus {
             "draft" => Ok(Self::Draft),
             "pending_review" => Ok(Self::PendingReview),
             "blocked" => Ok(Self::Blocked),
+            "sending" => Ok(Self::Sending),
             "sent" => Ok(Self::Sent),
             "discarded" => Ok(Self::Discarded),
+            "failed" => Ok(Self::Failed),
             _ => Err(format!("unknown draft status: {s}")),
         }
     }
@@ -114,7 +114,7 @@ impl Database {
                     "SELECT {SNOOZED_COLS} FROM snoozed \
                      WHERE return_at <= ?1 AND account = ?2 ORDER BY return_at ASC"
                 );
-                let mut stmt = self.conn().prepare(&sql)?;
+                let mut stmt = self.conn().prepare_cached(&sql)?;
                 let rows = stmt.query_map(params![now, a], Self::map_snoozed)?;
                 rows.filter_map(|r| r.ok()).collect()
             }
@@ -123,7 +123,7 @@ impl Database {
                     "SELECT {SNOOZED_COLS} FROM snoozed \
                      WHERE return_at <= ?1 ORDER BY return_at ASC"
                 );
-                let mut stmt = self.conn().prepare(&sql)?;
+                let mut stmt = self.conn().prepare_cached(&sql)?;
                 let rows = stmt.query_map(params![now], Self::map_snoozed)?;
                 rows.filter_map(|r| r.ok()).collect()
             }
@@ -132,6 +132,25 @@ impl Database {
         Ok(messages)
     }
 
+    /// Seconds from `now` until the earliest snoozed message returns, or `None`
+    /// when nothing is snoozed past `now`. `now` uses the same local-time format
+    /// as [`Database::list_snoozed_due`].
+    pub fn seconds_until_next_snooze_return(&self, now: &str) -> Result<Option<f64>> {
+        use rusqlite::OptionalExtension;
+
+        let seconds = self
+            .conn()
+            .prepare_cached(
+                "SELECT (julianday(return_at) - julianday(?1)) * 86400.0
+                 FROM snoozed WHERE return_at > ?1
+                 ORDER BY return_at
+                 LIMIT 1",
+            )?
+            .query_row(params![now], |row| row.get::<_, Option<f64>>(0))
+            .optional()?;
+        Ok(seconds.flatten())
+    }
+
     /// List snoozed messages with reason "waiting-reply" or "follow-up" that haven't
     /// received a reply yet, optionally filtered by account.
     pub fn list_snoozed_awaiting_reply(
@@ -194,7 +213,8 @@ impl Database {
     pub fn delete_snoozed(&self, id: &str) -> Result<bool> {
         let rows = self
             .conn()
-            .execute("DELETE FROM snoozed WHERE id = ?1", params![id])?;
+            .prepare_cached("DELETE FROM snoozed WHERE id = ?1")?
+            .execute(params![id])?;
         Ok(rows > 0)
     }
 
@@ -327,6 +347,32 @@ mod tests {
         assert_eq!(due[0].uid, 100);
     }
 
+    #[test]
+    fn seconds_until_next_snooze_return() {
+        let db = Database::open_memory().unwrap();
+        let now = "2026-06-01T00:00:00";
+        assert_eq!(db.seconds_until_next_snooze_return(now).unwrap(), None);
+
+        for (uid, return_at) in [(1, "2026-05-01T00:00:00"), (2, "2026-06-01T00:01:30")] {
+            db.create_snoozed(
+                "test@test.com",
+                uid,
+                "INBOX",
+                "Snoozed",
+                return_at,
+                None,
+                None,
+                None,
+                None,
+                None,
+            )
+            .unwrap();
+        }
+
+        let seconds = db.seconds_until_next_snooze_return(now).unwrap().unwrap();
+        assert!((seconds - 90.0).abs() < 0.01, "got {seconds}");
+    }
+
     #[test]
     fn delete_snoozed() {
         let db = Database::open_memory().unwrap();
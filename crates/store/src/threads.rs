@@ -28,11 +28,12 @@ impl Database {
     ) -> Result<Thread> {
         let thread_id = Uuid::new_v4().to_string();
 
-        self.conn().execute(
-            "INSERT INTO threads (thread_id, subject_normalized, first_seen, last_activity, message_count, account_id)
-             VALUES (?1, ?2, ?3, ?4, 0, ?5)",
-            params![thread_id, subject_normalized, first_seen, last_activity, account_id],
-        )?;
+        self.conn()
+            .prepare_cached(
+                "INSERT INTO threads (thread_id, subject_normalized, first_seen, last_activity, message_count, account_id)
+                 VALUES (?1, ?2, ?3, ?4, 0, ?5)",
+            )?
+            .execute(params![thread_id, subject_normalized, first_seen, last_activity, account_id])?;
 
         self.get_thread(&thread_id)?.ok_or_else(|| {
             crate::errors::StoreError::Config(format!("thread not found after insert: {thread_id}"))
@@ -42,7 +43,7 @@ impl Database {
     /// Get a thread by ID.
     pub fn get_thread(&self, thread_id: &str) -> Result<Option<Thread>> {
         let sql = format!("SELECT {THREAD_COLS} FROM threads WHERE thread_id = ?1");
-        let mut stmt = self.conn().prepare(&sql)?;
+        let mut stmt = self.conn().prepare_cached(&sql)?;
         let thread = stmt
             .query_row(params![thread_id], Self::map_thread)
             .optional()?;
@@ -59,7 +60,7 @@ impl Database {
             "SELECT {THREAD_COLS} FROM threads \
              WHERE subject_normalized = ?1 AND account_id = ?2"
         );
-        let mut stmt = self.conn().prepare(&sql)?;
+        let mut stmt = self.conn().prepare_cached(&sql)?;
         let thread = stmt
             .query_row(params![subject_normalized, account_id], Self::map_thread)
             .optional()?;
@@ -93,14 +94,15 @@ impl Database {
 
     /// Update thread timestamps and message count from its messages.
     pub fn refresh_thread_stats(&self, thread_id: &str) -> Result<()> {
-        self.conn().execute(
-            "UPDATE threads SET
-                message_count = (SELECT COUNT(*) FROM thread_messages WHERE thread_id = ?1),
-                first_seen = COALESCE((SELECT MIN(date) FROM thread_messages WHERE thread_id = ?1), first_seen),
-                last_activity = COALESCE((SELECT MAX(date) FROM thread_messages WHERE thread_id = ?1), last_activity)
-             WHERE thread_id = ?1",
-            params![thread_id],
-        )?;
+        self.conn()
+            .prepare_cached(
+                "UPDATE threads SET
+                    message_count = (SELECT COUNT(*) FROM thread_messages WHERE thread_id = ?1),
+                    first_seen = COALESCE((SELECT MIN(date) FROM thread_messages WHERE thread_id = ?1), first_seen),
+                    last_activity = COALESCE((SELECT MAX(date) FROM thread_messages WHERE thread_id = ?1), last_activity)
+                 WHERE thread_id = ?1",
+            )?
+            .execute(params![thread_id])?;
         Ok(())
     }
 
@@ -140,19 +142,20 @@ impl Database {
         let existing_id: Option<i64> = if let Some(mid) = message_id {
             let id: Option<i64> = self
                 .conn()
-                .query_row(
+                .prepare_cached(
                     "SELECT id FROM thread_messages WHERE message_id = ?1 AND folder = ?2",
-                    params![mid, folder],
-                    |row| row.get(0),
-                )
+                )?
+                .query_row(params![mid, folder], |row| row.get(0))
                 .optional()?;
             id
         } else {
-            let id: Option<i64> = self.conn().query_row(
-                "SELECT id FROM thread_messages WHERE uid = ?1 AND folder = ?2 AND thread_id = ?3",
-                params![uid as i64, folder, thread_id],
-                |row| row.get(0),
-            ).optional()?;
+            let id: Option<i64> = self
+                .conn()
+                .prepare_cached(
+                    "SELECT id FROM thread_messages WHERE uid = ?1 AND folder = ?2 AND thread_id = ?3",
+                )?
+                .query_row(params![uid as i64, folder, thread_id], |row| row.get(0))
+                .optional()?;
             id
         };
 
@@ -160,13 +163,15 @@ impl Database {
 
         if let Some(id) = existing_id {
             // Update existing
-            self.conn().execute(
-                "UPDATE thread_messages SET
-                    thread_id = ?1, uid = ?2, in_reply_to = ?3, reference_ids = ?4,
-                    from_address = ?5, to_addresses = ?6, date = ?7, subject = ?8,
-                    is_outbound = ?9, snippet = ?10
-                 WHERE id = ?11",
-                params![
+            self.conn()
+                .prepare_cached(
+                    "UPDATE thread_messages SET
+                        thread_id = ?1, uid = ?2, in_reply_to = ?3, reference_ids = ?4,
+                        from_address = ?5, to_addresses = ?6, date = ?7, subject = ?8,
+                        is_outbound = ?9, snippet = ?10
+                     WHERE id = ?11",
+                )?
+                .execute(params![
                     thread_id,
                     uid as i64,
                     in_reply_to,
@@ -178,17 +183,18 @@ impl Database {
                     is_outbound_int,
                     snippet,
                     id
-                ],
-            )?;
+                ])?;
             Ok(id)
         } else {
             // Insert new
-            self.conn().execute(
-                "INSERT INTO thread_messages
-                    (thread_id, uid, message_id, in_reply_to, reference_ids, folder,
-                     from_address, to_addresses, date, subject, is_outbound, snippet)
-                 VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12)",
-                params![
+            self.conn()
+                .prepare_cached(
+                    "INSERT INTO thread_messages
+                        (thread_id, uid, message_id, in_reply_to, reference_ids, folder,
+                         from_address, to_addresses, date, subject, is_outbound, snippet)
+                     VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12)",
+                )?
+                .execute(params![
                     thread_id,
                     uid as i64,
                     message_id,
@@ -201,8 +207,7 @@ impl Database {
                     subject,
                     is_outbound_int,
                     snippet
-                ],
-            )?;
+                ])?;
             Ok(self.conn().last_insert_rowid())
         }
     }
@@ -227,13 +232,12 @@ impl Database {
     ) -> Result<Option<String>> {
         let thread_id: Option<String> = self
             .conn()
-            .query_row(
+            .prepare_cached(
                 "SELECT tm.thread_id FROM thread_messages tm \
                  INNER JOIN threads t ON t.thread_id = tm.thread_id \
                  WHERE tm.message_id = ?1 AND t.account_id = ?2 LIMIT 1",
-                params![message_id, account_id],
-                |row| row.get(0),
-            )
+            )?
+            .query_row(params![message_id, account_id], |row| row.get(0))
             .optional()?;
         Ok(thread_id)
     }
@@ -272,11 +276,11 @@ impl Database {
              WHERE tm.message_id IN ({}) AND t.account_id = ?{account_param_idx} LIMIT 1",
             placeholders.join(", ")
         );
-        let mut stmt = self.conn().prepare(&sql)?;
-        let mut params: Vec<&dyn rusqlite::types::ToSql> = references
-            .iter()
-            .map(|r| r as &dyn rusqlite::types::ToSql)
-            .collect();
+        // The SQL text only varies with the number of references, so the
+        // statement cache still hits for the common 1–5 reference cases.
+        let mut stmt = self.conn().prepare_cached(&sql)?;
+        let mut params: Vec<&dyn rusqlite::types::ToSql> = Vec::with_capacity(references.len() + 1);
+        params.extend(references.iter().map(|r| r as &dyn rusqlite::types::ToSql));
         params.push(&account_id as &dyn rusqlite::types::ToSql);
         let thread_id: Option<String> = stmt
             .query_row(params.as_slice(), |row| row.get(0))
@@ -284,6 +288,40 @@ impl Database {
         Ok(thread_id)
     }
 
+    /// Resolve a prioritized list of Message-IDs to a thread in one query.
+    ///
+    /// Returns the thread of the first ID in `message_ids` that is already
+    /// indexed for the account. Equivalent to calling
+    /// [`find_thread_by_message_id`](Self::find_thread_by_message_id) for
+    /// each ID in turn, but with a single round-trip.
+    pub fn find_thread_by_first_message_id(
+        &self,
+        message_ids: &[&str],
+        account_id: &str,
+    ) -> Result<Option<String>> {
+        if message_ids.is_empty() {
+            return Ok(None);
+        }
+        let placeholders: Vec<String> = (1..=message_ids.len()).map(|i| format!("?{i}")).collect();
+        let account_param_idx = message_ids.len() + 1;
+        let sql = format!(
+            "SELECT tm.message_id, tm.thread_id FROM thread_messages tm \
+             INNER JOIN threads t ON t.thread_id = tm.thread_id \
+             WHERE tm.message_id IN ({}) AND t.account_id = ?{account_param_idx}",
+            placeholders.join(", ")
+        );
+        let mut stmt = self.conn().prepare_cached(&sql)?;
+        let mut params: Vec<&dyn rusqlite::types::ToSql> = Vec::with_capacity(message_ids.len() + 1);
+        params.extend(message_ids.iter().map(|m| m as &dyn rusqlite::types::ToSql));
+        params.push(&account_id as &dyn rusqlite::types::ToSql);
+        let found: std::collections::HashMap<String, String> = stmt
+            .query_map(params.as_slice(), |row| Ok((row.get(0)?, row.get(1)?)))?
+            .collect::<rusqlite::Result<_>>()?;
+        Ok(message_ids
+            .iter()
+            .find_map(|mid| found.get(*mid).cloned()))
+    }
+
     /// Get thread context for a message (for enriching inbox/read output).
     /// Returns (thread_id, message_count, has_outbound_reply, reply_uid).
     pub fn get_thread_context_for_uid(
@@ -342,14 +380,15 @@ impl Database {
 
     /// Set the last-synced UID for a folder/account pair.
     pub fn set_last_synced_uid(&self, account_id: &str, folder: &str, uid: u32) -> Result<()> {
-        self.conn().execute(
-            "INSERT INTO thread_sync_state (account_id, folder, last_uid, synced_at)
-             VALUES (?1, ?2, ?3, datetime('now'))
-             ON CONFLICT(account_id, folder) DO UPDATE SET
-                last_uid = excluded.last_uid,
-                synced_at = excluded.synced_at",
-            params![account_id, folder, uid as i64],
-        )?;
+        self.conn()
+            .prepare_cached(
+                "INSERT INTO thread_sync_state (account_id, folder, last_uid, synced_at)
+                 VALUES (?1, ?2, ?3, datetime('now'))
+                 ON CONFLICT(account_id, folder) DO UPDATE SET
+                    last_uid = excluded.last_uid,
+                    synced_at = excluded.synced_at",
+            )?
+            .execute(params![account_id, folder, uid as i64])?;
         Ok(())
     }
 
@@ -618,6 +657,48 @@ mod tests {
         assert!(not_found.is_none());
     }
 
+    #[test]
+    fn find_thread_by_first_message_id_respects_priority() {
+        let db = Database::open_memory().unwrap();
+        let ts = "2026-03-28T10:00:00";
+        let first = db.create_thread("first", ts, ts, "acct1").unwrap();
+        let second = db.create_thread("second", ts, ts, "acct1").unwrap();
+        for (thread, mid, uid) in [(&first, "<a@x.com>", 1), (&second, "<b@x.com>", 2)] {
+            db.upsert_thread_message(
+                &thread.thread_id,
+                uid,
+                Some(mid),
+                None,
+                None,
+                "INBOX",
+                "a@b.com",
+                "c@d.com",
+                ts,
+                "Test",
+                false,
+                None,
+            )
+            .unwrap();
+        }
+
+        let found = db
+            .find_thread_by_first_message_id(&["<nope@x.com>", "<b@x.com>", "<a@x.com>"], "acct1")
+            .unwrap();
+        assert_eq!(found, Some(second.thread_id.clone()));
+
+        let found = db
+            .find_thread_by_first_message_id(&["<a@x.com>", "<b@x.com>"], "acct1")
+            .unwrap();
+        assert_eq!(found, Some(first.thread_id.clone()));
+
+        assert!(
+            db.find_thread_by_first_message_id(&["<a@x.com>"], "acct2")
+                .unwrap()
+                .is_none()
+        );
+        assert!(db.find_thread_by_first_message_id(&[], "acct1").unwrap().is_none());
+    }
+
     #[test]
     fn find_thread_by_references() {
         let db = Database::open_memory().unwrap();